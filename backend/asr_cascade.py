@@ -0,0 +1,164 @@
+import os
+import re
+import time
+import threading
+from typing import Optional
+
+ASR_SMALL_MODEL = os.environ.get("ASR_SMALL_MODEL", "tiny")  # Tried first on short clips
+ASR_LARGE_MODEL = os.environ.get("ASR_LARGE_MODEL", "base")  # Long clips, and the short ones the small model fails
+ASR_SHORT_CLIP_SECONDS = 8.0  # Longer clips (e.g. a dictated description) go to the large model directly
+ASR_MIN_AVG_LOGPROB = -0.8  # Escalate when a segment of the small model is less confident than this
+ASR_MAX_NO_SPEECH_PROB = 0.5  # Escalate when the small model thinks a segment may be silence
+SAMPLE_RATE = 16000  # Whisper resamples every clip to 16 kHz
+
+# Whisper's usual hallucinations on silence or noise
+HALLUCINATED_PHRASES = ("thank you for watching", "thanks for watching", "subtitles by", "please subscribe")
+
+
+def is_plausible_transcript(text: str) -> bool:
+    """ A quick sanity check of a transcript, e.g.
+        'Yes, confirm.' -> True
+        '' -> False
+        'you you you you you' -> False
+    """
+    words = re.findall(r"[a-z0-9']+", text.lower())
+    if not words:
+        return False
+    if any(phrase in text.lower() for phrase in HALLUCINATED_PHRASES):
+        return False
+    # The same word over and over is a decoding loop
+    if len(words) >= 4 and len(set(words)) <= len(words) // 4:
+        return False
+
+    return True
+
+
+def escalation_reason(result: dict) -> Optional[str]:
+    """Why the transcription of the small model should not be trusted, None if it can be used"""
+    segments = result.get("segments", [])
+    if any(s["avg_logprob"] < ASR_MIN_AVG_LOGPROB for s in segments):
+        return "low_logprob"
+    if any(s["no_speech_prob"] > ASR_MAX_NO_SPEECH_PROB for s in segments):
+        return "no_speech"
+    if not is_plausible_transcript(result["text"]):
+        return "implausible_transcript"
+
+    return None
+
+
+class ASRCascade:
+    """
+    Transcribes short clips (e.g. "yes, confirm") with a small Whisper model first, and only runs the large one when
+    the small model is unsure, or the clip is long. Both models stay loaded.
+
+    """
+
+    def __init__(self, small_model: str = ASR_SMALL_MODEL, large_model: str = ASR_LARGE_MODEL):
+        self.model_names = {"small": small_model, "large": large_model}
+        self.models = {}
+        # Whisper's decoder keeps its attention cache in hooks on the shared model, one decode at a time per model
+        self.model_locks = {size: threading.Lock() for size in self.model_names}
+        self.lock = threading.Lock()  # Clips are transcribed in worker threads
+        self.counters = {
+            "clips": 0,
+            "small_only": 0,
+            "escalated": 0,
+            "large_only": 0,
+            "audio_seconds": 0.0,
+        }
+        self.escalation_reasons = {}
+        self.compute_seconds = {"small": 0.0, "large": 0.0}
+        self.large_audio_seconds = 0.0  # Audio transcribed by the large model, to estimate its speed
+        self.small_only_audio_seconds = 0.0
+        self.small_only_compute_seconds = 0.0
+        self.wasted_small_seconds = 0.0  # Time the small model spent on clips escalated anyway
+
+    def load(self) -> None:
+        import whisper
+
+        for size, name in self.model_names.items():
+            self.models[size] = whisper.load_model(name)
+
+    @property
+    def loaded(self) -> bool:
+        return len(self.models) == len(self.model_names)
+
+    def run(self, size: str, audio) -> tuple[dict, float]:
+        with self.model_locks[size]:
+            started = time.perf_counter()
+            result = self.models[size].transcribe(audio)
+
+        return result, time.perf_counter() - started
+
+    def transcribe(self, audio_path: str) -> dict:
+        """ Transcribe the clip with the cheapest model that gives a trustworthy result.
+
+        Returns:
+            The result of whisper's transcribe, with the additional keys:
+                - model: "small" or "large", the model of the transcript
+                - escalation_reason: why the small model's transcript was dropped, None if it was not
+        """
+        import whisper
+
+        # Decode the clip once for both models
+        audio = whisper.load_audio(audio_path)
+        duration = len(audio) / SAMPLE_RATE
+
+        reason, small_elapsed = None, 0.0
+        if duration <= ASR_SHORT_CLIP_SECONDS and self.model_names["small"] != self.model_names["large"]:
+            result, small_elapsed = self.run("small", audio)
+            reason = escalation_reason(result)
+            if reason is None:
+                self.record(duration, small_elapsed, None, None)
+                return {**result, "model": "small", "escalation_reason": None}
+
+        result, large_elapsed = self.run("large", audio)
+        self.record(duration, small_elapsed, large_elapsed, reason)
+
+        return {**result, "model": "large", "escalation_reason": reason}
+
+    def record(
+        self, duration: float, small_elapsed: float, large_elapsed: Optional[float], reason: Optional[str]
+    ) -> None:
+        with self.lock:
+            self.counters["clips"] += 1
+            self.counters["audio_seconds"] += duration
+            self.compute_seconds["small"] += small_elapsed
+
+            if large_elapsed is None:
+                self.counters["small_only"] += 1
+                self.small_only_audio_seconds += duration
+                self.small_only_compute_seconds += small_elapsed
+                return
+
+            self.compute_seconds["large"] += large_elapsed
+            self.large_audio_seconds += duration
+            if reason is None:
+                self.counters["large_only"] += 1
+            else:
+                self.counters["escalated"] += 1
+                self.escalation_reasons[reason] = self.escalation_reasons.get(reason, 0) + 1
+                self.wasted_small_seconds += small_elapsed
+
+    def stats(self) -> dict:
+        """How often the small model was enough, and the compute saved compared to the large model alone"""
+        with self.lock:
+            tried_small = self.counters["small_only"] + self.counters["escalated"]
+            saved = None
+            if self.large_audio_seconds:
+                # The large model's compute per second of audio, applied to the clips it did not have to transcribe
+                large_speed = self.compute_seconds["large"] / self.large_audio_seconds
+                saved = (
+                    large_speed * self.small_only_audio_seconds
+                    - self.small_only_compute_seconds
+                    - self.wasted_small_seconds
+                )
+
+            return {
+                "models": self.model_names,
+                **self.counters,
+                "escalation_rate": self.counters["escalated"] / tried_small if tried_small else None,
+                "escalation_reasons": dict(self.escalation_reasons),
+                "compute_seconds": dict(self.compute_seconds),
+                "estimated_compute_saved_seconds": saved,
+            }
@@ -0,0 +1,105 @@
+import time
+import hashlib
+import threading
+from io import BytesIO
+from typing import Optional, Tuple
+
+AUDIO_TTL = 10 * 60  # How long a generated voice reply can be fetched (seconds)
+
+
+def text_to_mp3(text: str) -> bytes:
+    """Converts text to speech, returns the MP3 audio data"""
+    from gtts import gTTS
+
+    tts = gTTS(text=text, lang="en", slow=False)
+    mp3_fp = BytesIO()
+    tts.write_to_fp(mp3_fp)
+
+    return mp3_fp.getvalue()
+
+
+def parse_range_header(range_header: str, size: int) -> Optional[Tuple[int, int]]:
+    """ Parse a single-range HTTP Range header into the first and last byte positions (both included).
+
+    Example (size=1000):
+        'bytes=0-499' -> (0, 499)
+        'bytes=500-' -> (500, 999)
+        'bytes=-100' -> (900, 999)
+
+    Returns:
+        The byte positions, or None if the range cannot be satisfied
+    """
+    try:
+        unit, byte_range = range_header.split("=", 1)
+        if unit.strip() != "bytes" or "," in byte_range:
+            return None
+        first, last = byte_range.strip().split("-", 1)
+
+        if first == "":
+            # Suffix range: the last N bytes
+            length = int(last)
+            if length <= 0:
+                return None
+            return max(size - length, 0), size - 1
+
+        first = int(first)
+        last = int(last) if last else size - 1
+    except ValueError:
+        return None
+
+    if first >= size or last < first:
+        return None
+
+    return first, min(last, size - 1)
+
+
+class AudioStore:
+    """
+    Keeps the generated voice replies in memory for AUDIO_TTL seconds, addressed by the hash of their content,
+    so they can be served as plain MP3 files instead of base64 strings inside the JSON replies.
+
+    """
+
+    def __init__(self, ttl: float = AUDIO_TTL):
+        self.ttl = ttl
+        self.clips = {}  # digest -> (mp3 data, expiry time)
+        self.digest_by_text = {}  # The same text is only converted to speech once while its clip is alive
+        self.lock = threading.Lock()  # Speech is generated in worker threads
+
+    def put(self, data: bytes) -> str:
+        digest = hashlib.sha256(data).hexdigest()[:32]
+        now = time.time()
+
+        with self.lock:
+            self.clips[digest] = (data, now + self.ttl)
+            # Drop the expired clips
+            for expired in [d for d, (_, expiry) in self.clips.items() if expiry < now]:
+                del self.clips[expired]
+            self.digest_by_text = {
+                t: d for t, d in self.digest_by_text.items() if d in self.clips
+            }
+
+        return digest
+
+    def get(self, digest: str) -> Optional[bytes]:
+        with self.lock:
+            clip = self.clips.get(digest)
+
+        if clip is None or clip[1] < time.time():
+            return None
+        return clip[0]
+
+    def synthesize(self, text: str) -> str:
+        """Convert the text to speech and store it, returns the digest of the clip"""
+        with self.lock:
+            digest = self.digest_by_text.get(text)
+            if digest in self.clips:
+                # Still alive, just extend it
+                self.clips[digest] = (self.clips[digest][0], time.time() + self.ttl)
+                return digest
+
+        digest = self.put(text_to_mp3(text))
+        with self.lock:
+            self.digest_by_text[text] = digest
+
+        return digest
@@ -0,0 +1,124 @@
+import time
+import asyncio
+from datetime import datetime, timezone
+from typing import Callable, Optional
+
+from calendar_backend import CalendarBackend
+
+AUTH_CHECK_TTL = 5 * 60  # How long the result of a login check is trusted (seconds)
+AUTH_CHECK_TIMEOUT = 30  # A login check taking longer than this is given up, the last known state is kept (seconds)
+AUTH_REFRESH_INTERVAL = 4 * 60  # Pause between two background checks, shorter than the TTL (seconds)
+
+
+class AuthState:
+    """
+    The last known login state of the calendar backend, so that the calendar operations do not have to check it on
+    every request. It is checked again in the background before it expires, which also keeps the session alive.
+
+    """
+
+    def __init__(
+        self,
+        backend: CalendarBackend,
+        ttl: float = AUTH_CHECK_TTL,
+        on_signed_in: Optional[Callable[[], None]] = None,
+    ):
+        self.backend = backend
+        self.ttl = ttl
+        self.on_signed_in = on_signed_in  # Called every time the user is found signed in, e.g. to start a worker
+        self.signed_in: Optional[bool] = None  # None until the first check is done
+        self.checked_at: Optional[float] = None
+        self.check_error: Optional[str] = None  # Why the last check failed, None if it did not
+        self.check_task = None
+        self.keepalive_task = None
+
+    def session_expired(self) -> bool:
+        """Whether the sign-in cookies are known to be expired, without any request"""
+        try:
+            expiry = self.backend.session_expiry()
+        except Exception as e:
+            print(f"Failed to read the session expiry: {e}")
+            return False
+
+        return expiry is not None and expiry < datetime.now(timezone.utc).replace(tzinfo=None)
+
+    def set(self, signed_in: bool) -> None:
+        self.signed_in = signed_in
+        self.checked_at = time.time()
+        if signed_in and self.on_signed_in is not None:
+            self.on_signed_in()
+
+    async def run_check(self) -> Optional[bool]:
+        if self.session_expired():
+            self.set(False)
+            return False
+
+        try:
+            signed_in = await asyncio.wait_for(self.backend.auth_status(), AUTH_CHECK_TIMEOUT)
+        except Exception as e:
+            # A slow page or a network error says nothing about the login, only a sign out does
+            print(f"Login check failed, keeping the last known state ({self.signed_in}): {e!r}")
+            self.check_error = repr(e)
+            return self.signed_in
+
+        self.check_error = None
+        self.set(signed_in)
+        return signed_in
+
+    def refresh_in_background(self) -> asyncio.Task:
+        """Start a check, unless one is already running"""
+        if self.check_task is None or self.check_task.done():
+            self.check_task = asyncio.create_task(self.run_check())
+
+        return self.check_task
+
+    async def refresh(self) -> Optional[bool]:
+        """Check the login now, or wait for the check already running"""
+        return await asyncio.shield(self.refresh_in_background())
+
+    def is_signed_in(self) -> Optional[bool]:
+        """ The cached login state, never waits for a check. An outdated state is returned as is, and checked
+            again in the background. A signed out state is checked again right away, the user may have signed
+            in since.
+
+        Returns:
+            Whether the user is signed in, None if it is not known yet.
+            False only follows a sign out reported by the calendar, or expired sign-in cookies.
+        """
+        if self.signed_in and self.session_expired():
+            self.set(False)
+        elif self.signed_in is False or self.checked_at is None or time.time() - self.checked_at > self.ttl:
+            self.refresh_in_background()
+
+        return self.signed_in
+
+    def status(self) -> dict:
+        expiry = self.backend.session_expiry()
+
+        return {
+            "signed_in": self.signed_in,
+            "checked_seconds_ago": time.time() - self.checked_at if self.checked_at else None,
+            "checking": self.check_task is not None and not self.check_task.done(),
+            "last_check_error": self.check_error,
+            "session_expires_at": expiry.isoformat() + "Z" if expiry else None,
+        }
+
+    async def keepalive(self) -> None:
+        while True:
+            await self.refresh()
+            await asyncio.sleep(AUTH_REFRESH_INTERVAL)
+
+    def start(self) -> None:
+        if self.keepalive_task is None or self.keepalive_task.done():
+            self.keepalive_task = asyncio.create_task(self.keepalive())
+
+    async def stop(self) -> None:
+        for task in (self.keepalive_task, self.check_task):
+            if task is not None and not task.done():
+                task.cancel()
+                try:
+                    await task
+                except asyncio.CancelledError:
+                    pass
+        self.keepalive_task = None
+        self.check_task = None
@@ -0,0 +1,92 @@
+"""
+Compares creating a series of events one by one (one create_event call per event) with creating them as one batch
+(create_events).
+
+The HTTP backend is measured against the local stand-in server (benchmarks/calendar_stub_server.py). With --playwright,
+the browser automation backend creates the events on the real Google Calendar, one browser launch per event versus
+one for the whole batch.
+
+Run from the backend directory:
+    python -m benchmarks.batch_create --events 5 --latency-ms 50
+"""
+
+import os
+import time
+import asyncio
+import argparse
+from datetime import datetime, timedelta
+
+STUB_PORT = 8001
+
+
+def make_series(count: int) -> list[dict]:
+    """Daily 9:00am-9:15am standups, starting tomorrow"""
+    first_day = datetime.now() + timedelta(days=1)
+    series = []
+    for i in range(count):
+        day = (first_day + timedelta(days=i)).strftime("%d/%m/%Y")
+        series.append(
+            {
+                "meeting_name": f"Standup {i + 1}",
+                "location": "",
+                "description": "",
+                "start_date": day,
+                "end_date": day,
+                "start_time": "09:00am",
+                "end_time": "09:15am",
+            }
+        )
+
+    return series
+
+
+async def compare(backend, count: int) -> None:
+    started = time.perf_counter()
+    sequential_results = [await backend.create_event(a) for a in make_series(count)]
+    sequential = time.perf_counter() - started
+
+    started = time.perf_counter()
+    batch_results = await backend.create_events(make_series(count))
+    batch = time.perf_counter() - started
+
+    for name, elapsed, results in (
+        ("sequential", sequential, sequential_results),
+        ("batch", batch, batch_results),
+    ):
+        succeeded = sum(r["success"] for r in results)
+        print(f"  {name:<10} {elapsed * 1000:9.1f}ms  {succeeded}/{count} created")
+    print(f"  speedup    {sequential / batch:9.2f}x")
+
+
+async def main(args) -> None:
+    os.environ["STUB_LATENCY_MS"] = str(args.latency_ms)
+    from benchmarks.calendar_stub_server import serve_in_background
+    from calendar_backend import HttpCalendarBackend, PlaywrightCalendarBackend
+
+    server = await serve_in_background(STUB_PORT)
+
+    backend = HttpCalendarBackend(
+        base_url=f"http://127.0.0.1:{STUB_PORT}/calendar/v3", token="stub"
+    )
+    print(f"HTTP backend, {args.events} events ({args.latency_ms}ms simulated latency):")
+    await compare(backend, args.events)
+    await backend.close()
+
+    if args.playwright:
+        print(f"Playwright backend, {args.events} events:")
+        await compare(PlaywrightCalendarBackend(), args.events)
+
+    server.should_exit = True
+    await server.task
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--events", type=int, default=5)
+    parser.add_argument("--latency-ms", type=float, default=20)
+    parser.add_argument(
+        "--playwright",
+        action="store_true",
+        help="Also measure the browser automation backend (creates real events)",
+    )
+    asyncio.run(main(parser.parse_args()))
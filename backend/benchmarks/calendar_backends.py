@@ -0,0 +1,92 @@
+"""
+Times the calendar operations of each CalendarBackend.
+
+The HTTP backend is measured against the local stand-in server (benchmarks/calendar_stub_server.py), started in-process.
+The Playwright backend drives the real Google Calendar website with the 'session' profile, so it is only measured
+with --playwright, after signing in through the assistant once.
+
+Run from the backend directory:
+    python -m benchmarks.calendar_backends --iterations 50 --latency-ms 20
+"""
+
+import os
+import time
+import asyncio
+import argparse
+import statistics
+from datetime import datetime, timedelta
+
+STUB_PORT = 8001
+
+
+def report(name: str, durations: list[float]) -> None:
+    durations_ms = sorted(d * 1000 for d in durations)
+    p95 = durations_ms[min(len(durations_ms) - 1, int(len(durations_ms) * 0.95))]
+    print(
+        f"  {name:<14} n={len(durations_ms):<4} mean={statistics.mean(durations_ms):9.1f}ms "
+        f"p50={statistics.median(durations_ms):9.1f}ms p95={p95:9.1f}ms"
+    )
+
+
+async def measure(backend, iterations: int) -> None:
+    day = datetime.now() + timedelta(days=1)
+    date_str = day.strftime("%d%m%Y")
+    week_end = (day + timedelta(days=6)).strftime("%d%m%Y")
+    appointment = {
+        "meeting_name": "Benchmark",
+        "location": "",
+        "description": "",
+        "start_date": day.strftime("%d/%m/%Y"),
+        "end_date": day.strftime("%d/%m/%Y"),
+        "start_time": "10:00am",
+        "end_time": "11:00am",
+    }
+
+    operations = {
+        "auth_status": lambda: backend.auth_status(),
+        "create_event": lambda: backend.create_event(appointment),
+        "list_events": lambda: backend.list_events(date_str, date_str),
+        "list_week": lambda: backend.list_events(date_str, week_end),
+        "free_busy": lambda: backend.free_busy(date_str, week_end),
+    }
+    for name, operation in operations.items():
+        durations = []
+        for _ in range(iterations):
+            started = time.perf_counter()
+            await operation()
+            durations.append(time.perf_counter() - started)
+        report(name, durations)
+
+
+async def main(args) -> None:
+    os.environ["STUB_LATENCY_MS"] = str(args.latency_ms)
+    from benchmarks.calendar_stub_server import serve_in_background
+    from calendar_backend import HttpCalendarBackend, PlaywrightCalendarBackend
+
+    server = await serve_in_background(STUB_PORT)
+
+    backend = HttpCalendarBackend(
+        base_url=f"http://127.0.0.1:{STUB_PORT}/calendar/v3", token="stub"
+    )
+    print(f"HTTP backend against the local stub ({args.latency_ms}ms simulated latency):")
+    await measure(backend, args.iterations)
+    await backend.close()
+
+    if args.playwright:
+        print("Playwright backend against calendar.google.com:")
+        await measure(PlaywrightCalendarBackend(), 1)
+
+    server.should_exit = True
+    await server.task
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--iterations", type=int, default=20)
+    parser.add_argument("--latency-ms", type=float, default=0)
+    parser.add_argument(
+        "--playwright",
+        action="store_true",
+        help="Also measure the browser automation backend (creates a real event)",
+    )
+    asyncio.run(main(parser.parse_args()))
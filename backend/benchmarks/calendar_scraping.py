@@ -0,0 +1,116 @@
+"""
+Compares the two ways of reading the events of the Schedule view of Google Calendar:
+    locators: the former loop of get_event_from_date, several awaited Playwright calls per row
+    evaluate: scheduling.extract_events, one page.evaluate call for all the days
+
+The page is a local fixture mimicking the markup of the Schedule view (div[data-datekey] days, div[role="row"]
+events), with hundreds of events. Both methods must find the same events.
+
+Run from the backend directory:
+    python -m benchmarks.calendar_scraping --days 14 --events-per-day 30 --iterations 5
+"""
+
+import time
+import asyncio
+import argparse
+import statistics
+from datetime import datetime, timedelta
+
+
+def to_google_time(dt: datetime) -> str:
+    """datetime(2026, 1, 6, 13, 30) -> '1:30pm', the way the website shows times"""
+    return dt.strftime("%I:%M%p").lstrip("0").lower()
+
+
+def make_fixture(first_day: datetime, days: int, events_per_day: int) -> str:
+    """The Schedule view of `days` days, each with `events_per_day` events (and one duplicated row)"""
+    from scheduling import get_google_calendar_datekey
+
+    day_containers = []
+    for i in range(days):
+        day = first_day + timedelta(days=i)
+        datekey = get_google_calendar_datekey(day.strftime("%d%m%Y"))
+
+        rows = []
+        for j in range(events_per_day):
+            start = day.replace(hour=8, minute=0) + timedelta(minutes=15 * j)
+            time_str = f"{to_google_time(start)} – {to_google_time(start + timedelta(minutes=15))}"
+            # The title is nested twice, like on the website, so its text shows up twice
+            rows.append(
+                f'<div role="row"><div>{day.day}</div>'
+                f"<div><div>{time_str}</div><div><div>Meeting {j + 1}</div></div></div></div>"
+            )
+        rows.append(rows[0])  # The website repeats the rows of the events spanning several views
+
+        day_containers.append(f'<div data-datekey="{datekey}">{"".join(rows)}</div>')
+
+    return f'<html><body><div role="main">{"".join(day_containers)}</div></body></html>'
+
+
+async def extract_events_with_locators(page, datekey: int) -> list[list[str]]:
+    """The locator loop get_event_from_date used before extract_events"""
+    events = []
+    day_container = page.locator(f'div[data-datekey="{datekey}"]')
+    rows = await day_container.locator('div[role="row"]').all()
+
+    for row in rows:
+        second_div = row.locator("xpath=./div[2]")
+        if await second_div.count() > 0:
+            nested_texts = await second_div.locator("div").all_inner_texts()
+
+            clean_row_list = [text.strip() for text in nested_texts if text.strip()]
+            unique_row_list = list(dict.fromkeys(clean_row_list))
+
+            if unique_row_list:
+                events.append(unique_row_list)
+
+    return events
+
+
+async def main(args) -> None:
+    from playwright.async_api import async_playwright
+    from scheduling import extract_events, get_google_calendar_datekey
+
+    first_day = datetime.now() + timedelta(days=1)
+    datekeys = [
+        get_google_calendar_datekey((first_day + timedelta(days=i)).strftime("%d%m%Y"))
+        for i in range(args.days)
+    ]
+
+    async with async_playwright() as p:
+        browser = await p.chromium.launch()
+        page = await browser.new_page()
+        await page.set_content(make_fixture(first_day, args.days, args.events_per_day))
+
+        durations = {"locators": [], "evaluate": []}
+        for _ in range(args.iterations):
+            started = time.perf_counter()
+            locator_events = []
+            for datekey in datekeys:
+                locator_events += [
+                    (datekey, e[0], e[1] if len(e) > 1 else "")
+                    for e in await extract_events_with_locators(page, datekey)
+                ]
+            durations["locators"].append(time.perf_counter() - started)
+
+            started = time.perf_counter()
+            events, _ = await extract_events(page, datekeys)
+            durations["evaluate"].append(time.perf_counter() - started)
+
+        await browser.close()
+
+    # The locator loop keeps the duplicated rows, extract_events drops them in the browser
+    assert list(dict.fromkeys(locator_events)) == [(e["datekey"], e["time"], e["title"]) for e in events]
+
+    print(f"{args.days} days, {len(events)} events ({len(locator_events)} rows):")
+    for name, times in durations.items():
+        print(f"  {name:<9} {statistics.median(times) * 1000:9.1f}ms (median of {len(times)})")
+    print(f"  speedup   {statistics.median(durations['locators']) / statistics.median(durations['evaluate']):9.1f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--days", type=int, default=14)
+    parser.add_argument("--events-per-day", type=int, default=30)
+    parser.add_argument("--iterations", type=int, default=5)
+    asyncio.run(main(parser.parse_args()))
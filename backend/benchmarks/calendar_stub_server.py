@@ -0,0 +1,106 @@
+"""
+A local stand-in for the Google Calendar REST API, implementing the endpoints used by HttpCalendarBackend
+with an in-memory store. Used for tests and benchmarks.
+
+Run from the backend directory:
+    fastapi run benchmarks/calendar_stub_server.py --port 8001
+
+and point the assistant to it:
+    CALENDAR_BACKEND=http CALENDAR_API_URL=http://127.0.0.1:8001/calendar/v3 CALENDAR_API_TOKEN=stub
+"""
+
+import os
+import uuid
+import asyncio
+import uvicorn
+from datetime import datetime
+from fastapi import FastAPI, Header, HTTPException, Request
+
+STUB_LATENCY = float(os.environ.get("STUB_LATENCY_MS", "0")) / 1000  # Simulated network/server time per call
+
+app = FastAPI()
+events: list[dict] = []
+
+
+def parse_time(time_obj: dict | str) -> datetime:
+    if isinstance(time_obj, str):
+        return datetime.fromisoformat(time_obj)
+    if "dateTime" in time_obj:
+        return datetime.fromisoformat(time_obj["dateTime"])
+    return datetime.fromisoformat(f"{time_obj['date']}T00:00:00").astimezone()
+
+
+async def authorize(authorization: str | None) -> None:
+    await asyncio.sleep(STUB_LATENCY)
+    if not authorization or not authorization.removeprefix("Bearer ").strip():
+        raise HTTPException(status_code=401, detail="Login Required")
+
+
+def events_between(time_min: str, time_max: str) -> list[dict]:
+    lower, upper = parse_time(time_min), parse_time(time_max)
+    return sorted(
+        (e for e in events if parse_time(e["start"]) < upper and parse_time(e["end"]) > lower),
+        key=lambda e: parse_time(e["start"]),
+    )
+
+
+@app.get("/calendar/v3/calendars/{calendar_id}")
+async def get_calendar(calendar_id: str, authorization: str | None = Header(None)):
+    await authorize(authorization)
+    return {"kind": "calendar#calendar", "id": calendar_id, "summary": "Stub calendar"}
+
+
+@app.get("/calendar/v3/calendars/{calendar_id}/events")
+async def list_events(
+    calendar_id: str,
+    timeMin: str,
+    timeMax: str,
+    authorization: str | None = Header(None),
+):
+    await authorize(authorization)
+    return {"kind": "calendar#events", "items": events_between(timeMin, timeMax)}
+
+
+@app.post("/calendar/v3/calendars/{calendar_id}/events")
+async def insert_event(
+    calendar_id: str, request: Request, authorization: str | None = Header(None)
+):
+    await authorize(authorization)
+    event = await request.json()
+    event["id"] = uuid.uuid4().hex
+    events.append(event)
+    return event
+
+
+@app.post("/calendar/v3/freeBusy")
+async def free_busy(request: Request, authorization: str | None = Header(None)):
+    await authorize(authorization)
+    body = await request.json()
+    busy = [
+        {"start": parse_time(e["start"]).isoformat(), "end": parse_time(e["end"]).isoformat()}
+        for e in events_between(body["timeMin"], body["timeMax"])
+    ]
+    return {
+        "kind": "calendar#freeBusy",
+        "timeMin": body["timeMin"],
+        "timeMax": body["timeMax"],
+        "calendars": {item["id"]: {"busy": busy} for item in body["items"]},
+    }
+
+
+@app.delete("/calendar/v3/calendars/{calendar_id}/events")
+async def clear_events(calendar_id: str):
+    """Not part of the Google API, resets the store between benchmark runs"""
+    events.clear()
+
+
+async def serve_in_background(port: int) -> uvicorn.Server:
+    """Start the stub server in the running event loop, stop it with `server.should_exit = True`"""
+    server = uvicorn.Server(
+        uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning")
+    )
+    server.task = asyncio.create_task(server.serve())
+    while not server.started:
+        await asyncio.sleep(0.05)
+
+    return server
@@ -0,0 +1,73 @@
+"""
+Checks that a slot cannot be booked twice because of the calendar mirror: once an event is created, the next conflict
+checks of its days must see it, without waiting for the mirror to refresh them.
+
+Runs the conflict check and event creation of the backend against the local stand-in of the calendar API
+(benchmarks/calendar_stub_server.py), with a throwaway mirror.
+
+Run from the backend directory:
+    python -m benchmarks.double_booking
+"""
+
+import os
+import asyncio
+import tempfile
+from datetime import datetime, timedelta
+
+STUB_PORT = 8001
+
+
+async def main(mirror_db_path: str) -> None:
+    os.environ.update(
+        CALENDAR_BACKEND="http",
+        CALENDAR_API_URL=f"http://127.0.0.1:{STUB_PORT}/calendar/v3",
+        CALENDAR_API_TOKEN="stub",
+        MIRROR_DB_PATH=mirror_db_path,
+    )
+    from benchmarks.calendar_stub_server import events, serve_in_background
+    import main as backend
+
+    server = await serve_in_background(STUB_PORT)
+    events.clear()
+
+    tomorrow = (datetime.now() + timedelta(days=1)).strftime("%d/%m/%Y")
+    appointment = {
+        "meeting_name": "Team sync",
+        "location": "",
+        "description": "",
+        "start_date": tomorrow,
+        "end_date": tomorrow,
+        "start_time": "10:00am",
+        "end_time": "11:00am",
+    }
+    series = {**appointment, "meeting_name": "Standup", "recurrence": {"frequency": "daily", "count": 3}}
+
+    try:
+        # First booking: free, and the day is mirrored by the check
+        assert not await backend.get_all_conflict_event([appointment]), "The calendar should be empty"
+        assert (await backend.create_events([appointment]))[0]["success"]
+
+        # Second booking of the same slot, right after
+        conflicts = await backend.get_all_conflict_event([appointment])
+        assert conflicts, "The second booking of the same slot was not reported as a conflict"
+        print(f"One-off appointment booked twice: conflict reported {conflicts}")
+
+        # The same goes for every occurrence of a series
+        assert await backend.get_recurring_conflict_message(series), "The series should conflict on its first day"
+        events.clear()
+        await backend.calendar_mirror.refresh_day(tomorrow.replace("/", ""))
+        assert not await backend.get_recurring_conflict_message(series), "The calendar should be empty"
+        assert (await backend.create_events([series]))[0]["success"]
+        message = await backend.get_recurring_conflict_message(series)
+        assert message, "The second booking of the series was not reported as a conflict"
+        print(f"Series booked twice: conflict reported\n{message}")
+    finally:
+        await backend.calendar_backend.close()
+        backend.calendar_mirror.conn.close()
+        server.should_exit = True
+        await server.task
+
+
+if __name__ == "__main__":
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        asyncio.run(main(os.path.join(tmp_dir, "calendar_mirror.db")))
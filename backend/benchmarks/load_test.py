@@ -0,0 +1,249 @@
+"""
+Load test of /api/process: N virtual users replay the scripted conversation of benchmarks/model_stub_server.py
+(follow-up question, confirmation, conflict, bypass) at the same time, each in its own session, with pre-recorded
+audio. The backend runs in a separate process (benchmarks/stubbed_backend.py) against the stand-in model and calendar
+servers, so only the work of the backend itself is measured. Needs ffmpeg for the conversion of the recordings.
+
+For each number of concurrent users, reports the throughput, the latency percentiles per turn type, and the
+queueing delay: the time spent waiting for a worker thread inside the backend (Server-Timing header), and the time
+spent outside the app (connection, event loop, upload).
+
+Run from the backend directory:
+    python -m benchmarks.load_test --audio recordings/sample.webm --users 1,4,16 --conversations 5
+
+--audio is either one recording used for every turn, or a directory with one recording per turn
+(follow_up.webm, confirmation.webm, conflict.webm, bypass.webm).
+"""
+
+import os
+import re
+import sys
+import time
+import asyncio
+import argparse
+import tempfile
+import subprocess
+from datetime import datetime, timedelta
+
+import httpx
+
+CALENDAR_STUB_PORT = 8001
+MODEL_STUB_PORT = 8010
+BACKEND_PORT = 8002
+
+# What the backend must answer at each turn for the conversation to be on script
+EXPECTED_REPLIES = {
+    "follow_up": "",
+    "confirmation": "Please confirm",
+    "conflict": "time conflict",
+    "bypass": "successfully added",
+}
+
+
+def percentile(values: list[float], q: float) -> float:
+    """Nearest-rank percentile, q between 0 and 100"""
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, max(0, round(q / 100 * len(ordered)) - 1))]
+
+
+def load_recordings(path: str, turns: tuple) -> dict[str, tuple[str, bytes]]:
+    """The recording (file name, content) played at each turn"""
+    files = {}
+    for turn in turns:
+        file_path = path
+        if os.path.isdir(path):
+            file_path = next(
+                os.path.join(path, f) for f in sorted(os.listdir(path)) if os.path.splitext(f)[0] == turn
+            )
+        with open(file_path, "rb") as fp:
+            files[turn] = (os.path.basename(file_path), fp.read())
+
+    return files
+
+
+def seed_conflicting_event() -> None:
+    """The event the scripted appointment (tomorrow, 10am to 11am) conflicts with"""
+    from benchmarks.calendar_stub_server import events
+
+    tomorrow = (datetime.now() + timedelta(days=1)).replace(hour=10, minute=0, second=0, microsecond=0)
+    events.clear()
+    events.append(
+        {
+            "id": "seeded",
+            "summary": "Existing meeting",
+            "start": {"dateTime": tomorrow.astimezone().isoformat()},
+            "end": {"dateTime": (tomorrow + timedelta(hours=1)).astimezone().isoformat()},
+        }
+    )
+
+
+def start_backend(args, mirror_db_path: str) -> subprocess.Popen:
+    env = {
+        **os.environ,
+        "PIPELINE_MODE": args.pipeline,
+        "OLLAMA_HOST": f"http://127.0.0.1:{MODEL_STUB_PORT}",
+        "GEMINI_BASE_URL": f"http://127.0.0.1:{MODEL_STUB_PORT}",
+        "GEMINI_API_KEY": "stub",
+        "CALENDAR_BACKEND": "http",
+        "CALENDAR_API_URL": f"http://127.0.0.1:{CALENDAR_STUB_PORT}/calendar/v3",
+        "CALENDAR_API_TOKEN": "stub",
+        "MIRROR_DB_PATH": mirror_db_path,
+        # Every virtual user keeps its session (plus the default one), none is dropped mid-conversation
+        "MAX_SESSIONS": str(max(args.users) + 1),
+    }
+    return subprocess.Popen(
+        [
+            sys.executable,
+            "-m",
+            "benchmarks.stubbed_backend",
+            "--port",
+            str(BACKEND_PORT),
+            "--tts-latency-ms",
+            str(args.tts_latency_ms),
+        ],
+        env=env,
+        stdout=subprocess.DEVNULL,  # Keep the report readable, errors still go to stderr
+    )
+
+
+async def wait_until_ready(client: httpx.AsyncClient, backend: subprocess.Popen, timeout: float) -> None:
+    deadline = time.perf_counter() + timeout
+    while time.perf_counter() < deadline:
+        if backend.poll() is not None:
+            raise RuntimeError(f"The backend exited with code {backend.returncode}")
+        try:
+            response = await client.get("/readyz")
+            if response.status_code == 200:
+                return
+            engines = response.json()["engines"]
+            if any(status.startswith("failed") for status in engines.values()):
+                raise RuntimeError(f"The backend failed to warm up: {engines}")
+        except httpx.TransportError:
+            pass
+        await asyncio.sleep(0.5)
+
+    raise TimeoutError("The backend was not ready in time")
+
+
+async def virtual_user(
+    client: httpx.AsyncClient, user_id: int, recordings: dict, conversations: int, samples: list[dict]
+) -> None:
+    headers = {"X-Session-Id": f"virtual-user-{user_id}"}
+    for _ in range(conversations):
+        await client.post("/api/reset", headers=headers)
+        for turn, (file_name, content) in recordings.items():
+            started = time.perf_counter()
+            try:
+                response = await client.post(
+                    "/api/process", headers=headers, files={"audio": (file_name, content)}
+                )
+            except httpx.HTTPError as e:
+                samples.append({"turn": turn, "latency": time.perf_counter() - started, "error": str(e)})
+                continue
+            latency = time.perf_counter() - started
+
+            server_timing = {
+                name: float(duration) / 1000
+                for name, duration in re.findall(r"(\w+);dur=([\d.]+)", response.headers.get("server-timing", ""))
+            }
+            error = None
+            if response.status_code != 200:
+                error = f"HTTP {response.status_code}"
+            elif "error" in response.json():
+                error = response.json()["error"]
+            elif EXPECTED_REPLIES[turn] not in response.json()["reply"]:
+                error = f"off script: {response.json()['reply'][:60]}"
+
+            samples.append(
+                {
+                    "turn": turn,
+                    "latency": latency,
+                    "queue": server_timing.get("queue", 0.0),
+                    "outside_app": latency - server_timing.get("app", latency),
+                    "error": error,
+                }
+            )
+
+
+def report(users: int, samples: list[dict], elapsed: float) -> None:
+    succeeded = [s for s in samples if s["error"] is None]
+    errors = [s["error"] for s in samples if s["error"] is not None]
+
+    def row(name: str, values: list[float]) -> str:
+        if not values:
+            return f"  {name:<14} n=0"
+        return (
+            f"  {name:<14} n={len(values):<5} p50={percentile(values, 50) * 1000:9.1f}ms "
+            f"p95={percentile(values, 95) * 1000:9.1f}ms p99={percentile(values, 99) * 1000:9.1f}ms"
+        )
+
+    print(
+        f"{users} concurrent users: {len(samples)} turns in {elapsed:.1f}s, "
+        f"{len(succeeded) / elapsed:.2f} turns/s, {len(errors)} errors"
+    )
+    for turn in EXPECTED_REPLIES:
+        print(row(turn, [s["latency"] for s in succeeded if s["turn"] == turn]))
+    print(row("all turns", [s["latency"] for s in succeeded]))
+    print("  queueing delay:")
+    print(row("worker thread", [s["queue"] for s in succeeded]))
+    print(row("outside app", [s["outside_app"] for s in succeeded]))
+    for error in sorted(set(errors))[:5]:
+        print(f"  error: {error} (x{errors.count(error)})")
+
+
+async def main(args) -> None:
+    from benchmarks import calendar_stub_server, model_stub_server
+
+    calendar_stub_server.STUB_LATENCY = args.calendar_latency_ms / 1000
+    model_stub_server.STUB_LATENCY = args.model_latency_ms / 1000
+    recordings = load_recordings(args.audio, model_stub_server.SCRIPT_TURNS)
+
+    calendar_server = await calendar_stub_server.serve_in_background(CALENDAR_STUB_PORT)
+    model_server = await model_stub_server.serve_in_background(MODEL_STUB_PORT)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        backend = start_backend(args, os.path.join(tmp_dir, "calendar_mirror.db"))
+        try:
+            async with httpx.AsyncClient(
+                base_url=f"http://127.0.0.1:{BACKEND_PORT}",
+                timeout=300,
+                limits=httpx.Limits(max_connections=None, max_keepalive_connections=None),
+            ) as client:
+                await wait_until_ready(client, backend, args.startup_timeout)
+
+                for users in args.users:
+                    seed_conflicting_event()
+                    samples = []
+                    started = time.perf_counter()
+                    await asyncio.gather(
+                        *(
+                            virtual_user(client, user_id, recordings, args.conversations, samples)
+                            for user_id in range(users)
+                        )
+                    )
+                    report(users, samples, time.perf_counter() - started)
+        finally:
+            backend.terminate()
+            backend.wait()
+
+    for server in (calendar_server, model_server):
+        server.should_exit = True
+        await server.task
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--audio", required=True, help="A recording, or a directory with one recording per turn")
+    parser.add_argument(
+        "--users",
+        default="1,4,16",
+        type=lambda value: [int(u) for u in value.split(",")],
+        help="Comma separated numbers of concurrent users to test",
+    )
+    parser.add_argument("--conversations", type=int, default=3, help="Conversations replayed by each user")
+    parser.add_argument("--pipeline", choices=("two_stage", "direct"), default="direct")
+    parser.add_argument("--model-latency-ms", type=float, default=300, help="Simulated model inference time")
+    parser.add_argument("--calendar-latency-ms", type=float, default=50, help="Simulated calendar API time")
+    parser.add_argument("--tts-latency-ms", type=float, default=100, help="Simulated speech synthesis time")
+    parser.add_argument("--startup-timeout", type=float, default=300, help="Seconds to wait for /readyz")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,137 @@
+"""
+A local stand-in for the model endpoints used by the assistant: the Ollama chat API (two-stage pipeline) and the
+Gemini generateContent API (direct pipeline). The replies follow a fixed script, picked by the number of user turns
+in the conversation, with a configurable latency. Used for benchmarks.
+
+Run from the backend directory:
+    fastapi run benchmarks/model_stub_server.py --port 8010
+
+and point the assistant to it:
+    OLLAMA_HOST=http://127.0.0.1:8010 GEMINI_BASE_URL=http://127.0.0.1:8010 GEMINI_API_KEY=stub
+"""
+
+import os
+import json
+import asyncio
+import uvicorn
+from datetime import datetime, timedelta, timezone
+from fastapi import FastAPI, Request
+
+STUB_LATENCY = float(os.environ.get("STUB_LATENCY_MS", "0")) / 1000  # Simulated inference time per call
+
+# The turns of a scripted conversation, in order, then it starts over
+SCRIPT_TURNS = ("follow_up", "confirmation", "conflict", "bypass")
+# What the stub "hears" in the recording of each turn (direct pipeline)
+SCRIPT_TRANSCRIPTS = {
+    "follow_up": "Book a meeting with the team tomorrow.",
+    "confirmation": "From 10am to 11am.",
+    "conflict": "Yes, that's correct.",
+    "bypass": "Book it anyway.",
+}
+
+app = FastAPI()
+
+
+def script_appointment() -> dict:
+    """The appointment every scripted conversation books: tomorrow, 10am to 11am"""
+    tomorrow = (datetime.now() + timedelta(days=1)).strftime("%d/%m/%Y")
+    return {
+        "meeting_name": "Team sync",
+        "location": "",
+        "description": "",
+        "start_date": tomorrow,
+        "end_date": tomorrow,
+        "start_time": "10:00am",
+        "end_time": "11:00am",
+    }
+
+
+def script_turn(user_turns: int) -> str:
+    """The turn of the script the conversation is at, after user_turns messages of the user"""
+    return SCRIPT_TURNS[(user_turns - 1) % len(SCRIPT_TURNS)]
+
+
+def scripted_reply(turn: str) -> str:
+    """ The reply the booking assistant would give at each turn of the script:
+        follow-up question -> confirmation -> appointment JSON (conflicts with the seeded event) -> bypass restriction
+    """
+    appointment = script_appointment()
+    if turn == "follow_up":
+        return "Sure! From what time to what time should the meeting be?"
+    if turn == "confirmation":
+        tomorrow = datetime.strptime(appointment["start_date"], "%d/%m/%Y")
+        return (
+            f"The meeting will be scheduled on {tomorrow.strftime('%B %d, %Y')}, from 10am to 11am. "
+            "Please confirm."
+        )
+    if turn == "conflict":
+        return json.dumps(appointment)
+    return f"bypass restriction {json.dumps(appointment)}"
+
+
+def now_str() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+@app.post("/api/chat")
+async def ollama_chat(request: Request):
+    body = await request.json()
+    await asyncio.sleep(STUB_LATENCY)
+    user_turns = sum(1 for m in body["messages"] if m["role"] == "user")
+
+    return {
+        "model": body["model"],
+        "created_at": now_str(),
+        "message": {"role": "assistant", "content": scripted_reply(script_turn(user_turns))},
+        "done": True,
+        "done_reason": "stop",
+    }
+
+
+@app.post("/api/generate")
+async def ollama_generate(request: Request):
+    body = await request.json()
+    return {"model": body["model"], "created_at": now_str(), "response": "", "done": True}
+
+
+@app.get("/v1beta/models/{model}")
+async def gemini_model(model: str):
+    return {"name": f"models/{model}", "displayName": model}
+
+
+@app.post("/v1beta/models/{model}:generateContent")
+async def gemini_generate_content(model: str, request: Request):
+    body = await request.json()
+    await asyncio.sleep(STUB_LATENCY)
+
+    # The first user content holds the instructions
+    user_turns = sum(1 for c in body["contents"] if c.get("role") == "user") - 1
+    turn = script_turn(user_turns)
+
+    reply = scripted_reply(turn)
+    last_parts = body["contents"][-1]["parts"]
+    if any("inlineData" in p or "inline_data" in p for p in last_parts):
+        reply = json.dumps({"transcript": SCRIPT_TRANSCRIPTS[turn], "reply": reply})
+
+    return {
+        "candidates": [
+            {
+                "content": {"role": "model", "parts": [{"text": reply}]},
+                "finishReason": "STOP",
+                "index": 0,
+            }
+        ],
+        "modelVersion": model,
+    }
+
+
+async def serve_in_background(port: int) -> uvicorn.Server:
+    """Start the stub server in the running event loop, stop it with `server.should_exit = True`"""
+    server = uvicorn.Server(
+        uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning")
+    )
+    server.task = asyncio.create_task(server.serve())
+    while not server.started:
+        await asyncio.sleep(0.05)
+
+    return server
@@ -0,0 +1,86 @@
+"""
+Compares the latency of one conversation turn in the two pipeline modes of /api/process:
+    two_stage: MP3 conversion -> Whisper transcription -> Ollama reply
+    direct:    MP3 conversion -> Gemini reply to the audio (transcript included)
+
+The models are served by the local stand-in server (benchmarks/model_stub_server.py) with a simulated inference time,
+Whisper runs for real on the given recording. Needs ffmpeg for the conversion.
+
+Run from the backend directory:
+    python -m benchmarks.pipeline_modes --audio recordings/sample.webm --iterations 5 --latency-ms 300
+"""
+
+import os
+import time
+import asyncio
+import argparse
+import statistics
+
+STUB_PORT = 8010
+
+
+def timed(stages: dict, name: str, fn, *args):
+    started = time.perf_counter()
+    result = fn(*args)
+    stages.setdefault(name, []).append(time.perf_counter() - started)
+
+    return result
+
+
+def report(mode: str, stages: dict) -> None:
+    totals = [sum(times) for times in zip(*stages.values())]
+    print(f"{mode}:")
+    for name, times in stages.items():
+        print(f"  {name:<12} {statistics.median(times) * 1000:9.1f}ms")
+    print(f"  {'total':<12} {statistics.median(totals) * 1000:9.1f}ms (median of {len(totals)})")
+
+
+async def main(args) -> None:
+    os.environ["STUB_LATENCY_MS"] = str(args.latency_ms)
+    os.environ["OLLAMA_HOST"] = f"http://127.0.0.1:{STUB_PORT}"
+    os.environ["GEMINI_BASE_URL"] = f"http://127.0.0.1:{STUB_PORT}"
+    os.environ.setdefault("GEMINI_API_KEY", "stub")
+    from benchmarks.model_stub_server import serve_in_background
+    from main import MP3_PATH, asr, convert_to_mp3
+    from model_gemini import AUDIO_REPLY_PROMPT, Gemini
+    from model_ollama import LLM_Helper, booking_assistant_prompt
+
+    server = await serve_in_background(STUB_PORT)
+    with open(args.audio, "rb") as fp:
+        recording = fp.read()
+
+    print("Loading Whisper...")
+    asr.load()
+    ollama = LLM_Helper()
+    gemini = Gemini(init_prompt=booking_assistant_prompt() + AUDIO_REPLY_PROMPT)
+
+    def two_stage_turn(stages: dict) -> None:
+        ollama.restart_chat_session()
+        mp3_data = timed(stages, "convert", convert_to_mp3, recording)
+        with open(MP3_PATH, "wb") as fp:
+            fp.write(mp3_data)
+        transcript = timed(stages, "transcribe", asr.transcribe, MP3_PATH)["text"]
+        timed(stages, "reply", ollama.ask_a_question, transcript)
+
+    def direct_turn(stages: dict) -> None:
+        gemini.restart_chat_session()
+        mp3_data = timed(stages, "convert", convert_to_mp3, recording)
+        timed(stages, "reply", gemini.ask_a_question_with_audio, mp3_data)
+
+    for mode, turn in (("two_stage", two_stage_turn), ("direct", direct_turn)):
+        stages = {}
+        await asyncio.to_thread(turn, {})  # Warm-up, not measured
+        for _ in range(args.iterations):
+            await asyncio.to_thread(turn, stages)
+        report(mode, stages)
+
+    server.should_exit = True
+    await server.task
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--audio", required=True, help="A recording of a booking request")
+    parser.add_argument("--iterations", type=int, default=5)
+    parser.add_argument("--latency-ms", type=float, default=300, help="Simulated model inference time")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,34 @@
+"""
+Runs the assistant backend with a silent voice for the replies instead of gTTS, so that it can be load tested
+offline against the local stand-in servers. benchmarks/load_test.py starts it in a separate process, with the
+environment pointing it to the stand-ins.
+
+Run from the backend directory:
+    python -m benchmarks.stubbed_backend --port 8002 --tts-latency-ms 100
+"""
+
+import time
+import argparse
+import uvicorn
+
+# One frame of silence: MPEG-1 Layer III, 128 kbps, 44.1 kHz, mono, 417 bytes
+SILENT_MP3 = bytes([0xFF, 0xFB, 0x90, 0xC0]) + bytes(413)
+
+
+def serve(args) -> None:
+    import audio_store
+    from main import app
+
+    def silent_text_to_mp3(text: str) -> bytes:
+        time.sleep(args.tts_latency_ms / 1000)  # Speech is generated in a worker thread, like gTTS
+        return SILENT_MP3 * 10
+
+    audio_store.text_to_mp3 = silent_text_to_mp3
+    uvicorn.run(app, host="127.0.0.1", port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--port", type=int, default=8002)
+    parser.add_argument("--tts-latency-ms", type=float, default=100, help="Simulated speech synthesis time")
+    serve(parser.parse_args())
@@ -0,0 +1,365 @@
+import os
+import asyncio
+import httpx
+from abc import ABC, abstractmethod
+from datetime import datetime, timedelta
+from typing import List, Optional, Tuple, TypedDict
+from zoneinfo import ZoneInfo
+
+from scheduling import (
+    AppointmentData,
+    add_calendar_event,
+    add_calendar_events,
+    check_if_google_calendar_login,
+    get_session_cookie_expiry,
+    start_browser,
+    stop_browser,
+    expand_occurrences,
+    get_events_from_dates,
+    get_google_calendar_datekey,
+    get_recurrence,
+    open_google_calendar_login,
+    parse_google_timestr_to_24h_range,
+    recurrence_to_rrule,
+)
+
+CALENDAR_BACKEND = os.environ.get("CALENDAR_BACKEND", "playwright")  # "playwright" or "http"
+CALENDAR_API_URL = os.environ.get(
+    "CALENDAR_API_URL", "https://www.googleapis.com/calendar/v3"
+)
+CALENDAR_API_TOKEN = os.environ.get("CALENDAR_API_TOKEN", "")
+CALENDAR_ID = os.environ.get("CALENDAR_ID", "primary")
+
+
+def local_timezone_name() -> Optional[str]:
+    """The IANA name of the host's time zone (e.g. 'Europe/Paris'), None if it cannot be found"""
+    if os.environ.get("TZ"):
+        name = os.environ["TZ"].lstrip(":")
+    else:
+        # /etc/localtime links to the zone, e.g. /usr/share/zoneinfo/Europe/Paris
+        zone_file = os.path.realpath("/etc/localtime")
+        if "zoneinfo/" not in zone_file:
+            return None
+        name = zone_file.split("zoneinfo/", 1)[1]
+
+    try:
+        ZoneInfo(name)  # TZ may also be a POSIX rule, e.g. 'CET-1CEST'
+    except Exception:
+        return None
+
+    return name
+
+
+# IANA name of the time zone of the appointments, Google Calendar expands recurring events in it
+CALENDAR_TIMEZONE = os.environ.get("CALENDAR_TIMEZONE") or local_timezone_name()
+
+
+class CalendarEvent(TypedDict):
+    date: str  # %d%m%Y
+    start_time: str  # HH:MM, 24-hours
+    end_time: str  # HH:MM, 24-hours
+    title: str
+
+
+def date_range(start_date: str, end_date: str) -> List[str]:
+    """ All the dates between start_date and end_date (both included), in %d%m%Y format
+    """
+    current = datetime.strptime(start_date, "%d%m%Y").date()
+    last = datetime.strptime(end_date, "%d%m%Y").date()
+    dates = []
+    while current <= last:
+        dates.append(current.strftime("%d%m%Y"))
+        current += timedelta(days=1)
+
+    return dates
+
+
+def appointment_to_datetimes(appointment: AppointmentData) -> Tuple[datetime, datetime]:
+    """ {'start_date': '31/12/2025', 'start_time': '09:00pm', ...} -> (datetime(2025, 12, 31, 21, 0), ...)
+    """
+    start_dt = datetime.strptime(
+        f"{appointment['start_date']} {appointment['start_time']}", "%d/%m/%Y %I:%M%p"
+    )
+    end_dt = datetime.strptime(
+        f"{appointment['end_date']} {appointment['end_time']}", "%d/%m/%Y %I:%M%p"
+    )
+
+    return start_dt, end_dt
+
+
+def events_to_busy_periods(events: List[CalendarEvent]) -> List[Tuple[datetime, datetime]]:
+    """ Merge the events into sorted, non-overlapping busy periods
+    """
+    periods = sorted(
+        (
+            datetime.strptime(f"{e['date']} {e['start_time']}", "%d%m%Y %H:%M"),
+            datetime.strptime(f"{e['date']} {e['end_time']}", "%d%m%Y %H:%M"),
+        )
+        for e in events
+    )
+
+    merged = []
+    for start, end in periods:
+        if merged and start <= merged[-1][1]:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+
+    return merged
+
+
+class CalendarBackend(ABC):
+    """
+    The operations the assistant needs from a calendar. Dates use the %d%m%Y format, like the rest of the scheduling code.
+
+    """
+
+    @abstractmethod
+    async def list_events(self, start_date: str, end_date: str) -> List[CalendarEvent]:
+        """List the events between start_date and end_date (both included), split per day"""
+
+    @abstractmethod
+    async def free_busy(self, start_date: str, end_date: str) -> List[Tuple[datetime, datetime]]:
+        """The busy periods between start_date and end_date (both included)"""
+
+    @abstractmethod
+    async def create_event(self, appointment: AppointmentData) -> dict:
+        """Add the appointment to the calendar, returns {"reply": str, "success": bool}"""
+
+    async def create_events(self, appointments: List[AppointmentData]) -> List[dict]:
+        """Add several appointments, returns one {"reply": str, "success": bool} per appointment"""
+        return [await self.create_event(appointment) for appointment in appointments]
+
+    @abstractmethod
+    async def auth_status(self) -> bool:
+        """ Whether the calendar can be accessed. False only when the calendar says the user is signed out,
+            raises when the check itself failed (timeout, network error, ...)
+        """
+
+    async def sign_in(self) -> bool:
+        """Let the user sign in if the backend supports it, returns whether the calendar can be accessed"""
+        try:
+            return await self.auth_status()
+        except Exception as e:
+            print(f"Login check failed: {e!r}")
+            return False
+
+    def session_expiry(self) -> Optional[datetime]:
+        """When the current sign-in expires (UTC), if it can be known without a request"""
+        return None
+
+    async def start(self) -> None:
+        """Get ready to serve requests, called once at startup"""
+
+    async def close(self) -> None:
+        pass
+
+
+class PlaywrightCalendarBackend(CalendarBackend):
+    """
+    Google Calendar through browser automation of calendar.google.com, using the 'session' browser profile.
+
+    """
+
+    async def list_events(self, start_date: str, end_date: str) -> List[CalendarEvent]:
+        dates = {get_google_calendar_datekey(d): d for d in date_range(start_date, end_date)}
+        events = []
+        # One page for the whole range
+        for scraped_event in await get_events_from_dates(list(dates.values())):
+            start, end = parse_google_timestr_to_24h_range(scraped_event["time"])
+            if not start:
+                continue
+            events.append(
+                {
+                    "date": dates[scraped_event["datekey"]],
+                    "start_time": start,
+                    "end_time": end,
+                    "title": scraped_event["title"],
+                }
+            )
+
+        return events
+
+    async def free_busy(self, start_date: str, end_date: str) -> List[Tuple[datetime, datetime]]:
+        return events_to_busy_periods(await self.list_events(start_date, end_date))
+
+    async def create_event(self, appointment: AppointmentData) -> dict:
+        return await add_calendar_event(appointment)
+
+    async def create_events(self, appointments: List[AppointmentData]) -> List[dict]:
+        # One browser launch for all of them, a recurring meeting is saved as a single recurring event
+        return await add_calendar_events(appointments)
+
+    async def auth_status(self) -> bool:
+        return await check_if_google_calendar_login()
+
+    async def sign_in(self) -> bool:
+        if not await open_google_calendar_login():
+            return False
+
+        return await super().sign_in()
+
+    def session_expiry(self) -> Optional[datetime]:
+        return get_session_cookie_expiry()
+
+    async def start(self) -> None:
+        # Keep one browser open for all the operations
+        await start_browser()
+
+    async def close(self) -> None:
+        await stop_browser()
+
+
+class HttpCalendarBackend(CalendarBackend):
+    """
+    Google Calendar through its REST API (events.list, freeBusy and events.insert), sharing one pooled HTTP client
+    between requests.
+
+    """
+
+    def __init__(
+        self,
+        base_url: str = CALENDAR_API_URL,
+        token: str = CALENDAR_API_TOKEN,
+        calendar_id: str = CALENDAR_ID,
+        timezone_name: Optional[str] = CALENDAR_TIMEZONE,
+    ):
+        self.calendar_id = calendar_id
+        self.timezone_name = timezone_name
+        # A zone rather than the current UTC offset, so that the events after a DST change keep their local time
+        self.timezone = ZoneInfo(timezone_name) if timezone_name else datetime.now().astimezone().tzinfo
+        self.client = httpx.AsyncClient(
+            base_url=base_url,
+            headers={"Authorization": f"Bearer {token}"},
+            limits=httpx.Limits(max_connections=20, max_keepalive_connections=20),
+            timeout=10,
+        )
+
+    def to_rfc3339(self, dt: datetime) -> str:
+        return dt.replace(tzinfo=self.timezone).isoformat()
+
+    def from_rfc3339(self, time_obj: dict) -> datetime:
+        """Read the start/end object of an API event as a naive local datetime"""
+        if "dateTime" in time_obj:
+            return (
+                datetime.fromisoformat(time_obj["dateTime"])
+                .astimezone(self.timezone)
+                .replace(tzinfo=None)
+            )
+        # All day events only have a date
+        return datetime.strptime(time_obj["date"], "%Y-%m-%d")
+
+    def time_bounds(self, start_date: str, end_date: str) -> dict:
+        time_min = datetime.strptime(start_date, "%d%m%Y")
+        time_max = datetime.strptime(end_date, "%d%m%Y") + timedelta(days=1)
+
+        return {"timeMin": self.to_rfc3339(time_min), "timeMax": self.to_rfc3339(time_max)}
+
+    async def list_events(self, start_date: str, end_date: str) -> List[CalendarEvent]:
+        dates = set(date_range(start_date, end_date))
+        params = {**self.time_bounds(start_date, end_date), "singleEvents": "true"}
+        events = []
+
+        while True:
+            response = await self.client.get(
+                f"/calendars/{self.calendar_id}/events", params=params
+            )
+            response.raise_for_status()
+            payload = response.json()
+
+            for item in payload.get("items", []):
+                start = self.from_rfc3339(item["start"])
+                end = self.from_rfc3339(item["end"])
+
+                # Split the event per day, the same way the calendar website shows it
+                day = start.replace(hour=0, minute=0)
+                while day < end:
+                    next_day = day + timedelta(days=1)
+                    date_str = day.strftime("%d%m%Y")
+                    if date_str in dates:
+                        events.append(
+                            {
+                                "date": date_str,
+                                "start_time": max(start, day).strftime("%H:%M"),
+                                "end_time": "23:59"
+                                if end >= next_day
+                                else end.strftime("%H:%M"),
+                                "title": item.get("summary", ""),
+                            }
+                        )
+                    day = next_day
+
+            if not payload.get("nextPageToken"):
+                return events
+            params["pageToken"] = payload["nextPageToken"]
+
+    async def free_busy(self, start_date: str, end_date: str) -> List[Tuple[datetime, datetime]]:
+        response = await self.client.post(
+            "/freeBusy",
+            json={
+                **self.time_bounds(start_date, end_date),
+                "items": [{"id": self.calendar_id}],
+            },
+        )
+        response.raise_for_status()
+        busy = response.json()["calendars"][self.calendar_id]["busy"]
+
+        return [
+            (self.from_rfc3339({"dateTime": b["start"]}), self.from_rfc3339({"dateTime": b["end"]}))
+            for b in busy
+        ]
+
+    async def create_event(self, appointment: AppointmentData) -> dict:
+        # Google counts the start as an occurrence even when the rule skips its day (e.g. a Saturday on weekdays),
+        # so a recurring event starts on its first expanded occurrence
+        start_dt, end_dt = appointment_to_datetimes(next(expand_occurrences(appointment)))
+        event = {
+            "summary": appointment["meeting_name"] or "Meeting",
+            "location": appointment["location"],
+            "description": appointment["description"],
+            "start": {"dateTime": self.to_rfc3339(start_dt)},
+            "end": {"dateTime": self.to_rfc3339(end_dt)},
+        }
+        if get_recurrence(appointment):
+            if not self.timezone_name:
+                print("Cannot create a recurring event: set CALENDAR_TIMEZONE to the IANA name of your time zone")
+                return {"reply": "I don't know your time zone, so I can't save a repeating meeting.", "success": False}
+            event["recurrence"] = [recurrence_to_rrule(appointment)]
+            event["start"]["timeZone"] = self.timezone_name
+            event["end"]["timeZone"] = self.timezone_name
+
+        try:
+            response = await self.client.post(
+                f"/calendars/{self.calendar_id}/events", json=event
+            )
+            response.raise_for_status()
+        except httpx.HTTPError as e:
+            print(f"Failed to create the event: {e}")
+            return {"reply": "I ran into an issue saving the event.", "success": False}
+
+        return {"reply": "Great! I've added that to your calendar.", "success": True}
+
+    async def create_events(self, appointments: List[AppointmentData]) -> List[dict]:
+        # The inserts share the pooled connections
+        return list(await asyncio.gather(*(self.create_event(a) for a in appointments)))
+
+    async def auth_status(self) -> bool:
+        response = await self.client.get(f"/calendars/{self.calendar_id}")
+        if response.status_code in (401, 403):
+            return False
+        # Any other error (e.g. 503) is a failed check, not a sign out
+        response.raise_for_status()
+
+        return True
+
+    async def close(self) -> None:
+        await self.client.aclose()
+
+
+def create_calendar_backend(name: str = CALENDAR_BACKEND) -> CalendarBackend:
+    if name == "http":
+        return HttpCalendarBackend()
+    if name == "playwright":
+        return PlaywrightCalendarBackend()
+
+    raise ValueError(f"Unknown calendar backend: {name}")
@@ -0,0 +1,261 @@
+import os
+import time
+import sqlite3
+import asyncio
+from datetime import datetime, timedelta
+from typing import Iterable, List, Optional, Tuple
+
+from scheduling import AppointmentData, expand_occurrences, get_google_calendar_datekey
+from calendar_backend import CalendarBackend, CalendarEvent, date_range
+
+MIRROR_DB_PATH = os.environ.get("MIRROR_DB_PATH", "calendar_mirror.db")
+MIRROR_WEEKS = 4  # How many weeks ahead of today are mirrored
+MIRROR_REFRESH_INTERVAL = 15 * 60  # A mirrored day is scraped again once it is older than this (seconds)
+MIRROR_MAX_STALENESS = 30 * 60  # Conflict checks scrape live when the mirrored day is older than this (seconds)
+MIRROR_SYNC_PAUSE = 30  # Pause between two background scrapes, leaves the browser to user requests (seconds)
+
+
+def to_minute(time_24h: str) -> int:
+    """'13:30' -> 810"""
+    h, m = time_24h.split(":")
+    return int(h) * 60 + int(m)
+
+
+def to_time_str(minute: int) -> str:
+    """810 -> '13:30'"""
+    return f"{minute // 60:02d}:{minute % 60:02d}"
+
+
+def from_datekey(datekey: int) -> datetime:
+    """The reverse of scheduling.get_google_calendar_datekey, e.g. 28574 -> datetime(2025, 12, 30)"""
+    return datetime((datekey >> 9) + 1970, (datekey >> 5) & 15, datekey & 31)
+
+
+class CalendarMirror:
+    """
+    A local SQLite copy of the next MIRROR_WEEKS weeks of the user's Google Calendar, kept up to date by a
+    background worker, so that conflict checks do not need to scrape the website every time.
+
+    """
+
+    def __init__(
+        self,
+        backend: CalendarBackend,
+        db_path: str = MIRROR_DB_PATH,
+        weeks: int = MIRROR_WEEKS,
+    ):
+        self.backend = backend
+        self.weeks = weeks
+        self.sync_task = None
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        self.conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS events (
+                datekey INTEGER NOT NULL,
+                start_minute INTEGER NOT NULL,
+                end_minute INTEGER NOT NULL,
+                title TEXT NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS events_by_day ON events (datekey, start_minute, end_minute);
+            CREATE TABLE IF NOT EXISTS synced_days (
+                datekey INTEGER PRIMARY KEY,
+                synced_at REAL NOT NULL
+            );
+            """
+        )
+        self.conn.commit()
+
+    def mirrored_dates(self) -> List[str]:
+        """The dates (%d%m%Y) covered by the mirror, starting from today"""
+        today = datetime.now().date()
+        return [
+            (today + timedelta(days=i)).strftime("%d%m%Y") for i in range(self.weeks * 7)
+        ]
+
+    def store_day(self, date_str: str, events: List[CalendarEvent]) -> None:
+        """Replace the mirrored events of a day with the ones listed by the calendar backend"""
+        datekey = get_google_calendar_datekey(date_str)
+        rows = [
+            (datekey, to_minute(e["start_time"]), to_minute(e["end_time"]), e["title"])
+            for e in events
+        ]
+
+        with self.conn:
+            self.conn.execute("DELETE FROM events WHERE datekey = ?", (datekey,))
+            self.conn.executemany("INSERT INTO events VALUES (?, ?, ?, ?)", rows)
+            self.conn.execute(
+                "INSERT OR REPLACE INTO synced_days VALUES (?, ?)", (datekey, time.time())
+            )
+
+    def forget_days(self, date_strs: Iterable[str]) -> None:
+        """Mark the days as never mirrored, so the next conflict check scrapes them live"""
+        with self.conn:
+            self.conn.executemany(
+                "DELETE FROM synced_days WHERE datekey = ?",
+                [(get_google_calendar_datekey(d),) for d in date_strs],
+            )
+
+    def forget_appointments(self, appointments: List[AppointmentData]) -> None:
+        """Forget the days covered by the appointments (every occurrence of the recurring ones), e.g. after adding
+        them to the calendar, otherwise the mirror would not see them until the next refresh
+        """
+        dates = set()
+        for appointment in appointments:
+            for occurrence in expand_occurrences(appointment):
+                dates.update(
+                    date_range(
+                        datetime.strptime(occurrence["start_date"], "%d/%m/%Y").strftime("%d%m%Y"),
+                        datetime.strptime(occurrence["end_date"], "%d/%m/%Y").strftime("%d%m%Y"),
+                    )
+                )
+
+        self.forget_days(dates)
+
+    async def refresh_day(self, date_str: str) -> None:
+        self.store_day(date_str, await self.backend.list_events(date_str, date_str))
+
+    def day_age(self, date_str: str) -> Optional[float]:
+        """Seconds since the day was last scraped, None if it has never been mirrored"""
+        row = self.conn.execute(
+            "SELECT synced_at FROM synced_days WHERE datekey = ?",
+            (get_google_calendar_datekey(date_str),),
+        ).fetchone()
+
+        return time.time() - row[0] if row else None
+
+    async def find_conflicting_events(
+        self, appointment_str: str
+    ) -> Tuple[List[Tuple[Tuple[str, str], str]], float]:
+        """ Same as scheduling.find_conflicting_events, but the events are looked up in the mirror.
+            The day is scraped live first if its mirrored copy is older than MIRROR_MAX_STALENESS.
+
+        Args:
+            appointment_str: 'DDMMYYYY,HH:MM-HH:MM', as returned by split_time_period
+
+        Returns:
+            A tuple containing:
+                - The conflicting events, e.g. [(('10:30', '17:21'), 'Meeting with Team')]
+                - How old the data used for the check is, in seconds
+        """
+        date_str, time_part = appointment_str.split(",")
+        appointment_start, appointment_end = time_part.split("-")
+
+        age = self.day_age(date_str)
+        if age is None or age > MIRROR_MAX_STALENESS:
+            await self.refresh_day(date_str)
+            age = 0.0
+
+        # Overlap Check: (StartA < EndB) and (EndA > StartB)
+        rows = self.conn.execute(
+            """
+            SELECT start_minute, end_minute, title FROM events
+            WHERE datekey = ? AND start_minute < ? AND end_minute > ?
+            ORDER BY start_minute
+            """,
+            (
+                get_google_calendar_datekey(date_str),
+                to_minute(appointment_end),
+                to_minute(appointment_start),
+            ),
+        ).fetchall()
+
+        return [((to_time_str(s), to_time_str(e)), title) for s, e, title in rows], age
+
+    async def get_events(
+        self, start_date: str, end_date: str
+    ) -> Tuple[List[Tuple[Tuple[datetime, datetime], str]], float]:
+        """ All the events between start_date and end_date (both included, %d%m%Y), e.g. the horizon of a
+            recurring meeting. The days which are missing or too old are listed with a single backend call.
+
+        Returns:
+            A tuple containing:
+                - The events, e.g. [((datetime(2026, 1, 6, 10), datetime(2026, 1, 6, 11)), 'Meeting with Eve')]
+                - How old the data is, in seconds
+        """
+        dates = date_range(start_date, end_date)
+        ages = [self.day_age(d) for d in dates]
+        stale = [d for d, age in zip(dates, ages) if age is None or age > MIRROR_MAX_STALENESS]
+
+        if stale:
+            events = await self.backend.list_events(stale[0], stale[-1])
+            for date_str in date_range(stale[0], stale[-1]):
+                self.store_day(date_str, [e for e in events if e["date"] == date_str])
+
+        stale_dates = set(stale)
+        age = max((a for d, a in zip(dates, ages) if d not in stale_dates), default=0.0)
+
+        rows = self.conn.execute(
+            """
+            SELECT datekey, start_minute, end_minute, title FROM events
+            WHERE datekey BETWEEN ? AND ?
+            ORDER BY datekey, start_minute
+            """,
+            (get_google_calendar_datekey(start_date), get_google_calendar_datekey(end_date)),
+        ).fetchall()
+
+        events = []
+        for datekey, start_minute, end_minute, title in rows:
+            day = from_datekey(datekey)
+            events.append(
+                (
+                    (day + timedelta(minutes=start_minute), day + timedelta(minutes=end_minute)),
+                    title,
+                )
+            )
+
+        return events, age
+
+    def stalest_day(self) -> Optional[str]:
+        """The mirrored date which needs a refresh the most, None if every day is fresh enough"""
+        stalest, stalest_age = None, MIRROR_REFRESH_INTERVAL
+        for date_str in self.mirrored_dates():
+            age = self.day_age(date_str)
+            if age is None:
+                return date_str
+            if age > stalest_age:
+                stalest, stalest_age = date_str, age
+
+        return stalest
+
+    def status(self) -> dict:
+        ages = [self.day_age(d) for d in self.mirrored_dates()]
+        synced = [a for a in ages if a is not None]
+
+        return {
+            "running": self.sync_task is not None and not self.sync_task.done(),
+            "days_mirrored": len(synced),
+            "days_total": len(ages),
+            "oldest_day_age_seconds": max(synced) if synced else None,
+        }
+
+    async def sync_forever(self) -> None:
+        """Refresh the stalest mirrored day, one day at a time"""
+        while True:
+            date_str = self.stalest_day()
+            if date_str:
+                try:
+                    await self.refresh_day(date_str)
+                except Exception as e:
+                    print(f"Calendar mirror failed to sync {date_str}: {e}")
+
+            # Drop the days that went out of the window
+            today_key = get_google_calendar_datekey(datetime.now().strftime("%d%m%Y"))
+            with self.conn:
+                self.conn.execute("DELETE FROM events WHERE datekey < ?", (today_key,))
+                self.conn.execute("DELETE FROM synced_days WHERE datekey < ?", (today_key,))
+
+            await asyncio.sleep(MIRROR_SYNC_PAUSE)
+
+    def start(self) -> None:
+        if self.sync_task is None or self.sync_task.done():
+            self.sync_task = asyncio.create_task(self.sync_forever())
+
+    async def stop(self) -> None:
+        if self.sync_task is not None:
+            self.sync_task.cancel()
+            try:
+                await self.sync_task
+            except asyncio.CancelledError:
+                pass
+            self.sync_task = None
+        self.conn.close()
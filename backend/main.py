@@ -1,21 +1,70 @@
+import time
+
+STARTED_AT = time.perf_counter()
+
 import os
 import re
 import json
-import whisper
-import shutil
-import base64
-from gtts import gTTS
+import asyncio
+import hashlib
+import contextvars
 from io import BytesIO
-from pydub import AudioSegment
-from fastapi import FastAPI, File, UploadFile
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, File, Header, Request, Response, UploadFile
 
 from scheduling import *
-from model_ollama import LLM_Helper
+from model_ollama import LLM_Helper, booking_assistant_prompt
+from calendar_mirror import CalendarMirror
+from audio_store import AudioStore, parse_range_header
+from asr_cascade import ASRCascade
+from auth_state import AuthState
+from calendar_backend import appointment_to_datetimes, create_calendar_backend
+
+
+# Whisper, Playwright, pydub and gTTS are only imported when they are used, the engines are warmed up in the
+# background once the server accepts connections, see /readyz
+ENGINES = ("asr", "llm", "calendar")
+
+# "two_stage": Whisper transcribes the recording locally, then Ollama answers the transcript
+# "direct": the recording is sent to a multimodal Gemini model, which transcribes and answers it in one call
+PIPELINE_MODE = os.environ.get("PIPELINE_MODE", "two_stage")
+
+
+def create_assistant():
+    if PIPELINE_MODE == "direct":
+        from model_gemini import AUDIO_REPLY_PROMPT, Gemini
+
+        return Gemini(init_prompt=booking_assistant_prompt() + AUDIO_REPLY_PROMPT)
+
+    return LLM_Helper()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    warm_up_task = asyncio.create_task(warm_up_engines())
+    yield
+    warm_up_task.cancel()
+    await auth_state.stop()
+    await calendar_mirror.stop()
+    await calendar_backend.close()
+
 
 # Init
-app = FastAPI()
-assistant = LLM_Helper()
-whisper_model = whisper.load_model("base")
+app = FastAPI(lifespan=lifespan)
+calendar_backend = create_calendar_backend()
+calendar_mirror = CalendarMirror(calendar_backend)
+# Checked in the background once the calendar backend is started, the mirror is synced once the user is signed in
+auth_state = AuthState(calendar_backend, on_signed_in=calendar_mirror.start)
+audio_store = AudioStore()
+asr = ASRCascade()  # The Whisper models are loaded by warm_up_engines()
+asr_loaded = asyncio.Event()
+
+startup_state = {
+    "engines": {engine: "starting" for engine in ENGINES},
+    "time_to_ready": None,
+    "time_to_first_response": None,
+}
 
 UPLOAD_DIR = "recordings"
 if not os.path.exists(UPLOAD_DIR):
@@ -24,8 +73,26 @@ MP3_PATH = os.path.join(
     UPLOAD_DIR, "talking.mp3"
 )  # This is the default path for saving user instruction
 
+# Each browser tab (or virtual user of benchmarks/load_test.py) can hold its own conversation, picked by the
+# X-Session-Id header. The frontend does not send it, so it always talks in the default session.
+DEFAULT_SESSION = "default"
+MAX_SESSIONS = int(os.environ.get("MAX_SESSIONS", "64"))  # Beyond that, the least recently used conversation is dropped
+
+# How long the current request waited for a free worker thread, reported in the Server-Timing header
+request_timing = contextvars.ContextVar("request_timing", default=None)
+
 
 # Helper functions
+def convert_to_mp3(audio_content: bytes) -> bytes:
+    """Converts a recording of any format supported by ffmpeg (e.g. WebM from the browser) to MP3, in memory"""
+    from pydub import AudioSegment
+
+    mp3_fp = BytesIO()
+    AudioSegment.from_file(BytesIO(audio_content)).export(mp3_fp, format="mp3")
+
+    return mp3_fp.getvalue()
+
+
 def extract_json_or_text(input_string: str) -> str:
     """Extract the json contained in input_string. If there is no json in the string, return input_string unmodified.
 
@@ -34,39 +101,171 @@ def extract_json_or_text(input_string: str) -> str:
         e.g. 'bypass restriction {"key1": "v1", "key2": "v2}'
 
     Returns:
-        Either the json inside the string, or return the unmodified input string
+        Either the json (object or array of objects) inside the string, or return the unmodified input string
         e.g. '{"key1": "v1", "key2": "v2}'
 
     """
-    json_match = re.search(r"(\{.*\})", input_string, re.DOTALL)
-
-    if json_match:
-        json_str = json_match.group(1)
+    # The reply may contain other brackets before the json (e.g. "[date]"), try each opening one in turn
+    decoder = json.JSONDecoder()
+    for match in re.finditer(r"[\[{]", input_string):
         try:
-            return json.loads(json_str)
+            value, _ = decoder.raw_decode(input_string, match.start())
         except json.JSONDecodeError:
-            return input_string
+            continue
+
+        if isinstance(value, dict) or (value and isinstance(value, list) and all(isinstance(v, dict) for v in value)):
+            return value
 
     return input_string
 
 
-def generate_audio_base64(text: str) -> str:
-    """Converts text to speech and encodes the resulting audio as a base64 string. This is useful for sending audio data directly to a frontend.
+async def generate_audio_url(text: str) -> str:
+    """Converts text to speech and stores the resulting MP3, so the frontend can stream it from /api/audio.
 
     Args:
         text: The string content to be converted into speech.
 
     Returns:
-        A base64-encoded UTF-8 string representing the MP3 audio data.
+        The short-lived URL of the MP3 audio, addressed by its content.
 
     """
-    tts = gTTS(text=text, lang="en", slow=False)
-    mp3_fp = BytesIO()
-    tts.write_to_fp(mp3_fp)
-    mp3_fp.seek(0)
-    audio_base64 = base64.b64encode(mp3_fp.read()).decode("utf-8")
+    digest = await run_in_worker(audio_store.synthesize, text)
+
+    return f"/api/audio/{digest}.mp3"
+
+
+async def run_in_worker(fn, *args):
+    """Same as asyncio.to_thread, also records the time spent waiting for a free worker thread in request_timing"""
+    submitted = time.perf_counter()
+
+    def call():
+        timing = request_timing.get()
+        if timing is not None:
+            timing["queue"] += time.perf_counter() - submitted
+        return fn(*args)
+
+    return await asyncio.to_thread(call)
+
+
+async def load_asr() -> None:
+    if PIPELINE_MODE == "direct":
+        # The multimodal model transcribes the recordings itself
+        asr_loaded.set()
+        return
+
+    try:
+        await asyncio.to_thread(asr.load)
+    finally:
+        asr_loaded.set()
+
+
+async def warm_up_engine(engine: str, warm_up) -> None:
+    started = time.perf_counter()
+    try:
+        await warm_up()
+    except Exception as e:
+        startup_state["engines"][engine] = f"failed: {e}"
+        print(f"Failed to warm up {engine}: {e}")
+        return
+
+    startup_state["engines"][engine] = "ready"
+    print(f"{engine} ready in {time.perf_counter() - started:.1f}s")
 
-    return audio_base64
+
+async def warm_up_engines() -> None:
+    """Load the ASR model, load the LLM into memory and launch the browser, all at the same time"""
+    await asyncio.gather(
+        warm_up_engine("asr", load_asr),
+        warm_up_engine("llm", lambda: asyncio.to_thread(get_session(DEFAULT_SESSION).assistant.warm_up)),
+        warm_up_engine("calendar", calendar_backend.start),
+    )
+    auth_state.start()
+
+    if all(status == "ready" for status in startup_state["engines"].values()):
+        startup_state["time_to_ready"] = time.perf_counter() - STARTED_AT
+        print(f"All engines ready {startup_state['time_to_ready']:.1f}s after startup")
+
+
+class ConflictPrefetch:
+    """
+    Runs the conflict check of the slot proposed in the confirmation turn in the background, so the
+    result is already waiting when the user confirms.
+    """
+
+    def __init__(self):
+        self.periods = None
+        self.task = None
+
+    def start(self, appointments: List[AppointmentData]) -> None:
+        """Start checking the slots, unless the same slots are already being checked."""
+        periods = get_periods(appointments)
+        if self.task is not None and self.periods == periods:
+            return
+
+        self.cancel()
+        self.periods = periods
+        self.task = asyncio.create_task(get_all_conflict_event(appointments))
+
+    def cancel(self) -> None:
+        if self.task is not None and not self.task.done():
+            self.task.cancel()
+        self.periods = None
+        self.task = None
+
+    async def take(self, appointments: List[AppointmentData]) -> dict | None:
+        """Return the prefetched conflicts if they cover the same slots as appointments, otherwise cancel them.
+
+        Returns:
+            The conflicts found by the background check, or None if there is no usable prefetch
+        """
+        task, periods = self.task, self.periods
+        self.periods = None
+        self.task = None
+
+        if task is None:
+            return None
+        if periods != get_periods(appointments):
+            task.cancel()
+            return None
+
+        try:
+            return await task
+        except Exception as e:
+            print(f"Prefetched conflict check failed, checking again: {e}")
+            return None
+
+
+class Session:
+    """
+    One conversation: the chat with the model, and the conflict check prefetched for it.
+    """
+
+    def __init__(self, session_id: str):
+        self.assistant = create_assistant()
+        self.conflict_prefetch = ConflictPrefetch()
+        if session_id == DEFAULT_SESSION:
+            self.mp3_path = MP3_PATH
+        else:
+            # The recordings of concurrent conversations must not overwrite each other
+            file_id = hashlib.sha256(session_id.encode()).hexdigest()[:16]
+            self.mp3_path = os.path.join(UPLOAD_DIR, f"talking-{file_id}.mp3")
+
+
+sessions: OrderedDict[str, Session] = OrderedDict()
+
+
+def get_session(session_id: str) -> Session:
+    """The conversation of session_id, a new one is started if it does not exist"""
+    if session_id in sessions:
+        sessions.move_to_end(session_id)
+        return sessions[session_id]
+
+    sessions[session_id] = Session(session_id)
+    if len(sessions) > MAX_SESSIONS:
+        _, dropped = sessions.popitem(last=False)
+        dropped.conflict_prefetch.cancel()
+
+    return sessions[session_id]
 
 
 """
@@ -74,6 +273,45 @@ def generate_audio_base64(text: str) -> str:
 """
 
 
+@app.middleware("http")
+async def record_time_to_first_response(request: Request, call_next):
+    response = await call_next(request)
+    if request.url.path == "/api/process" and startup_state["time_to_first_response"] is None:
+        startup_state["time_to_first_response"] = time.perf_counter() - STARTED_AT
+        print(f"First response sent {startup_state['time_to_first_response']:.1f}s after startup")
+
+    return response
+
+
+@app.middleware("http")
+async def add_server_timing(request: Request, call_next):
+    """Report how long the request took inside the app, and how much of it was spent waiting for a worker thread"""
+    started = time.perf_counter()
+    timing = {"queue": 0.0}
+    request_timing.set(timing)
+    response = await call_next(request)
+
+    response.headers["Server-Timing"] = (
+        f"queue;dur={timing['queue'] * 1000:.1f}, app;dur={(time.perf_counter() - started) * 1000:.1f}"
+    )
+    return response
+
+
+@app.get("/healthz")
+async def healthz() -> dict[str, str]:
+    """Liveness probe, the server accepts connections"""
+    return {"status": "ok"}
+
+
+@app.get("/readyz")
+async def readyz(response: Response) -> dict:
+    """Readiness probe, every engine is warm"""
+    ready = startup_state["time_to_ready"] is not None
+    response.status_code = 200 if ready else 503
+
+    return {"ready": ready, **startup_state}
+
+
 @app.get("/")
 async def root():
     """Hello World"""
@@ -84,73 +322,112 @@ async def root():
 
 
 @app.post("/api/reset")
-async def reset():
-    assistant.restart_chat_session()
+async def reset(x_session_id: str = Header(DEFAULT_SESSION)):
+    session = get_session(x_session_id)
+    session.conflict_prefetch.cancel()
+    session.assistant.restart_chat_session()
 
 
 @app.post("/api/get-audio")
 async def get_audio(text):
-    audio_data = generate_audio_base64(text)
-    return {"audio": audio_data}
+    return {"audio_url": await generate_audio_url(text)}
+
+
+@app.get("/api/audio/{digest}.mp3")
+async def serve_audio(digest: str, request: Request) -> Response:
+    """
+        Serves a generated voice reply as a raw MP3, with support for Range requests so the browser can start
+        playing it before the whole file has arrived.
+    """
+    data = audio_store.get(digest)
+    if data is None:
+        return Response(status_code=404)
+
+    headers = {
+        "Accept-Ranges": "bytes",
+        "ETag": f'"{digest}"',
+        # The URL changes with the content, so the clip never changes while it exists
+        "Cache-Control": f"private, max-age={int(audio_store.ttl)}, immutable",
+    }
+    if request.headers.get("if-none-match") == headers["ETag"]:
+        return Response(status_code=304, headers=headers)
+
+    range_header = request.headers.get("range")
+    if range_header is None:
+        return Response(content=data, media_type="audio/mpeg", headers=headers)
+
+    byte_range = parse_range_header(range_header, len(data))
+    if byte_range is None:
+        headers["Content-Range"] = f"bytes */{len(data)}"
+        return Response(status_code=416, headers=headers)
+
+    first, last = byte_range
+    headers["Content-Range"] = f"bytes {first}-{last}/{len(data)}"
+    return Response(
+        content=data[first : last + 1],
+        status_code=206,
+        media_type="audio/mpeg",
+        headers=headers,
+    )
+
+
+@app.get("/api/calendar-mirror")
+async def calendar_mirror_status() -> dict:
+    """Report how much of the calendar is mirrored locally and how stale it is"""
+    return calendar_mirror.status()
+
+
+@app.get("/api/auth-status")
+async def auth_status() -> dict:
+    """Report the cached login state of the calendar, without checking it"""
+    return auth_state.status()
+
+
+@app.get("/api/asr-stats")
+async def asr_stats() -> dict:
+    """Report how often the small speech recognition model was enough, and the compute it saved"""
+    return asr.stats()
 
 
 @app.get("/api/login")
-def login() -> dict[str, str]:
+async def login() -> dict[str, str]:
     """
-        Initializes a persistent browser session for Google Calendar authentication.
+        Makes sure the assistant can access the user's calendar.
 
-        This endpoint uses Playwright to launch a Chromium instance. If the user is 
-        not logged in, it allows for manual interaction. If a session already 
+        With the Playwright calendar backend, a Chromium window is opened on Google Calendar. If the user is
+        not logged in, it allows for manual interaction. If a session already
         exists, it verifies the 'Switch to Tasks' element to confirm access.
 
         Returns:
             dict: A JSON response containing:
                 - reply (str): Status message for the user.
-                - audio (str): Base64 encoded voice response of the status.
+                - audio_url (str): URL of the voice response of the status.
         
         Note:
             Uses a persistent context stored in the 'session' directory to maintain 
             login cookies across restarts.
     """
 
-    with sync_playwright() as p:
-        context = p.chromium.launch_persistent_context(
-            "session",  # Save cache
-            headless=False,
-            args=["--disable-blink-features=AutomationControlled"],
-        )
-
-        page = context.new_page()
-        page.goto("https://calendar.google.com")
-
-        try:
-            page.wait_for_selector('[aria-label="Switch to Tasks"]', timeout=0)
-            page.wait_for_load_state("networkidle")
-        except Exception as _:
-            assistant_response = "It seems like there are some issues when you are trying to sign in. Please refresh the webpage and try again."
-
-            return {
-                "reply": assistant_response,
-                "audio": generate_audio_base64(assistant_response),
-            }
-
-        context.close()
-
-    if check_if_google_calendar_login():
+    if await calendar_backend.sign_in():
+        auth_state.set(True)  # Starts the calendar mirror as well
         assistant_response = (
             "You are all set! Start scheduling by clicking the Talk button!"
         )
     else:
+        # The sign in may have failed without the user being signed out, let the check tell
+        auth_state.refresh_in_background()
         assistant_response = "It seems like there are some issues when you are trying to sign in. Please refresh the webpage and try again."
 
     return {
         "reply": assistant_response,
-        "audio": generate_audio_base64(assistant_response),
+        "audio_url": await generate_audio_url(assistant_response),
     }
 
 
 @app.post("/api/process")
-async def process(audio: UploadFile = File(...)) -> dict[str, str]:
+async def process(
+    audio: UploadFile = File(...), x_session_id: str = Header(DEFAULT_SESSION)
+) -> dict[str, str]:
     """
         Processes voice-based scheduling requests and manages Google Calendar integration.
 
@@ -158,104 +435,255 @@ async def process(audio: UploadFile = File(...)) -> dict[str, str]:
         1. Audio Conversion: Converts incoming WebM audio to MP3.
         2. Transcription: Uses OpenAI Whisper to convert speech to text.
         3. Intent Extraction: Uses an LLM to parse meeting details (date/time) from the transcript.
+           With PIPELINE_MODE=direct, steps 2 and 3 are a single call to a multimodal model instead.
         4. Conflict Validation: Checks Google Calendar for overlapping events.
         5. Execution: Adds the event to the calendar or returns a conflict warning.
 
         Args:
             audio (UploadFile): A multipart form-data file containing the user's voice recording.
+            x_session_id (str): The conversation the recording belongs to (X-Session-Id header).
 
         Returns:
             dict: A JSON response containing:
                 - message (str): The recognized transcript from the user.
                 - reply (str): The text-based response from the assistant.
-                - audio (str): A base64 encoded string of the assistant's voice reply.
+                - audio_url (str): URL of the assistant's voice reply.
     """
 
-    # 1. Fetch the input audio file and save as mp3 locally
-    temp_webm_path = os.path.join(UPLOAD_DIR, "temp_recording.webm")
-    with open(temp_webm_path, "wb") as buffer:
-        shutil.copyfileobj(audio.file, buffer)
-        buffer.flush()
+    session = get_session(x_session_id)
+    assistant, conflict_prefetch = session.assistant, session.conflict_prefetch
+
+    # 1. Fetch the input audio file and convert it to mp3
     try:
-        audio_data = AudioSegment.from_file(temp_webm_path)
-        audio_data.export(MP3_PATH, format="mp3")
-        os.remove(temp_webm_path)
+        mp3_data = await run_in_worker(convert_to_mp3, await audio.read())
     except Exception as e:
         return {"message": "Conversion failed", "error": str(e)}
 
-    # 2. Get the transcript of the input audio using Openai whisper model
-    transcript_payload = whisper_model.transcribe(MP3_PATH)
-    transcript = transcript_payload["text"]
-
-    # 3. Feed the transcript to the LLM model to get an reply
-    raw_model_response = assistant.ask_a_question(transcript)
+    # All the model calls run in a worker thread so that a prefetched conflict check can keep running meanwhile
+    if PIPELINE_MODE == "direct":
+        # 2. + 3. The multimodal model transcribes the audio and replies to it in a single call
+        transcript, raw_model_response = await run_in_worker(
+            assistant.ask_a_question_with_audio, mp3_data
+        )
+    else:
+        # 2. Get the transcript of the input audio using Openai whisper models, the small one first for short clips
+        with open(session.mp3_path, "wb") as fp:
+            fp.write(mp3_data)
+
+        await asr_loaded.wait()
+        if not asr.loaded:
+            return {"message": "Speech recognition is unavailable", "error": startup_state["engines"]["asr"]}
+        transcript_payload = await run_in_worker(asr.transcribe, session.mp3_path)
+        transcript = transcript_payload["text"]
+        if transcript_payload["escalation_reason"]:
+            print(f"Transcribed again with the large model: {transcript_payload['escalation_reason']}")
+
+        # 3. Feed the transcript to the LLM model to get an reply
+        raw_model_response = await run_in_worker(assistant.ask_a_question, transcript)
     parsed_model_response = extract_json_or_text(raw_model_response)
 
     # The model didnt return a json, which means the LLM need more information from user
-    if not isinstance(parsed_model_response, dict):
-        final_model_response = parsed_model_response
-        audio_data = generate_audio_base64(final_model_response)
-        return {"message": transcript, "reply": final_model_response, "audio": audio_data}
+    # A list of appointments is returned when several meetings are requested at once (e.g. a series)
+    is_appointment_list = isinstance(parsed_model_response, list) and all(
+        isinstance(a, dict) for a in parsed_model_response
+    )
+    if not (isinstance(parsed_model_response, dict) or (parsed_model_response and is_appointment_list)):
+        final_model_response = raw_model_response
+
+        # The LLM is asking the user to confirm a slot, start checking it for conflicts already
+        proposed_slot = parse_confirmation_message(final_model_response)
+        if proposed_slot and validate_meeting_time(proposed_slot)[0] and auth_state.is_signed_in() is not False:
+            conflict_prefetch.start([proposed_slot])
+        else:
+            conflict_prefetch.cancel()
+
+        audio_url = await generate_audio_url(final_model_response)
+        return {"message": transcript, "reply": final_model_response, "audio_url": audio_url}
+
+    appointments = parsed_model_response if is_appointment_list else [parsed_model_response]
+    describe = lambda a: f"{a['meeting_name'] or 'Meeting'} on {a['start_date']}"
 
     # 4. Perform a time conflict check to determine the final LLM reply, perform the scheduling on Google Calendar if no conflict found
-    is_time_valid, validate_msg = validate_meeting_time(parsed_model_response)
+    invalid_messages = []
+    for appointment in appointments:
+        is_time_valid, validate_msg = validate_meeting_time(appointment)
+        if not is_time_valid:
+            invalid_messages.append(
+                validate_msg if len(appointments) == 1 else f"{describe(appointment)}: {validate_msg}"
+            )
 
-    if not is_time_valid:
+    if invalid_messages:
+        conflict_prefetch.cancel()
         return await finalize_assistant_response(
-            transcript, f"Please select another time. {validate_msg}"
+            assistant,
+            transcript, f"Please select another time. {' '.join(invalid_messages)}"
         )
     
+    # The calendar cannot be reached without a valid login, tell the user right away instead of waiting for timeouts
+    if auth_state.is_signed_in() is False:
+        conflict_prefetch.cancel()
+        return await finalize_assistant_response(assistant, transcript, SIGN_IN_REQUIRED_REPLY)
+
     # Check for time conflict
-    if not "bypass restriction" in raw_model_response.lower():
-        all_conflicted_events = await get_all_conflict_event(parsed_model_response)
-        if all_conflicted_events:
+    if "bypass restriction" in raw_model_response.lower():
+        conflict_prefetch.cancel()
+    else:
+        # Recurring meetings are checked over their whole horizon at once, the others period by period
+        one_off_appointments = [a for a in appointments if not get_recurrence(a)]
+        recurring_appointments = [a for a in appointments if get_recurrence(a)]
+
+        all_conflicted_events = await conflict_prefetch.take(one_off_appointments)
+        if all_conflicted_events is None:
+            all_conflicted_events = await get_all_conflict_event(one_off_appointments)
+
+        conflict_messages = [generate_conflict_message(all_conflicted_events)] if all_conflicted_events else []
+        for appointment in recurring_appointments:
+            recurring_conflict_message = await get_recurring_conflict_message(appointment)
+            if recurring_conflict_message:
+                conflict_messages.append(recurring_conflict_message)
+
+        if conflict_messages:
             final_model_response = "It seems like there is a time conflict with the events shown below, Would you like to schedule for another time."
+            conflict_details = "\n".join(conflict_messages)
             return await finalize_assistant_response(
+                assistant,
                 transcript,
-                f"{final_model_response} {generate_conflict_message(all_conflicted_events)}",
+                f"{final_model_response} {conflict_details}",
                 final_model_response
             )
         
-    # 5. All good, add the event to Google Calendar now
-    await add_calendar_event(parsed_model_response)
+    # 5. All good, add the events to Google Calendar now, all of them in one go
+    results = await create_events(appointments)
+
+    failed = [describe(a) for a, r in zip(appointments, results) if not r["success"]]
+    if failed:
+        # Maybe signed out, find out before the next request
+        auth_state.refresh_in_background()
+    if len(appointments) == 1 and not failed and get_recurrence(appointments[0]):
+        occurrences = list(expand_occurrences(appointments[0]))
+        last_date = datetime.strptime(occurrences[-1]["start_date"], "%d/%m/%Y").strftime("%B %d, %Y")
+        final_model_response = (
+            f"Alright, the {len(occurrences)} meetings of the series, until {last_date}, "
+            "have been successfully added to the calendar!"
+        )
+    elif len(appointments) == 1:
+        final_model_response = (
+            results[0]["reply"]
+            if failed
+            else "Alright, the schedule has been successfully added to the calendar!"
+        )
+    elif failed:
+        final_model_response = (
+            f"I added {len(appointments) - len(failed)} of {len(appointments)} events to the calendar. "
+            f"These could not be saved: {', '.join(failed)}."
+        )
+    else:
+        final_model_response = (
+            f"Alright, all {len(appointments)} events have been successfully added to the calendar!"
+        )
 
-    return await finalize_assistant_response(
-        transcript,
-        "Alright, the schedule has been successfully added to the calendar!",
+    return await finalize_assistant_response(assistant, transcript, final_model_response)
+
+
+def get_periods(appointments: List[AppointmentData]) -> List[str]:
+    """The periods (see split_time_period) covered by the appointments, without duplicates"""
+    return list(
+        dict.fromkeys(p for appointment in appointments for p in split_time_period(appointment))
     )
 
-async def get_all_conflict_event(parsed_model_response: AppointmentData):
+
+async def get_all_conflict_event(appointments: List[AppointmentData]):
+    """Check all the appointments for conflicts in one pass, each day is looked up once"""
     all_conflicted_events = {}
 
-    periods = split_time_period(parsed_model_response)
+    data_age = 0.0
+
+    periods = get_periods(appointments)
     for period in periods:
         date, _ = period.split(",")
-        existing_events = await get_event_from_date(date)
-        preprocess_event = lambda e: (
-            parse_google_timestr_to_24h_range(e[0]),
-            e[1],
-        )
         format_date = lambda d: datetime.strptime(d, "%d%m%Y").strftime(
             "%B %d, %Y"
         )
-        curren_conflicting_event = find_conflicting_events(
-            period, [preprocess_event(i) for i in existing_events]
-        )
+        # Served from the local mirror, scraped live only if the mirrored day is too old
+        curren_conflicting_event, age = await calendar_mirror.find_conflicting_events(period)
+        data_age = max(data_age, age)
         if len(curren_conflicting_event) > 0:
-            all_conflicted_events[format_date(date)] = curren_conflicting_event
-    
+            day_conflicts = all_conflicted_events.setdefault(format_date(date), [])
+            day_conflicts += [e for e in curren_conflicting_event if e not in day_conflicts]
+
+    print(f"Conflict check done with calendar data up to {data_age:.0f}s old")
+
     return all_conflicted_events
 
-async def finalize_assistant_response(transcript: str, reply_text: str, reply_text_for_audio: str=None) -> dict:
+
+async def get_recurring_conflict_message(appointment: AppointmentData) -> str | None:
+    """Check every occurrence of a recurring appointment against the events of its whole horizon, fetched once.
+
+    Returns:
+        A short summary of the conflicting occurrences, None if there is no conflict
+    """
+    occurrences = list(expand_occurrences(appointment))
+    spans = [appointment_to_datetimes(o) for o in occurrences]
+
+    existing_events, data_age = await calendar_mirror.get_events(
+        spans[0][0].strftime("%d%m%Y"), spans[-1][1].strftime("%d%m%Y")
+    )
+    print(
+        f"Recurring conflict check of {len(occurrences)} occurrences done with calendar data up to {data_age:.0f}s old"
+    )
+
+    conflicts = [
+        (occurrence, [existing_events[i][1] for i in event_indexes])
+        for occurrence, event_indexes in zip(
+            occurrences, find_conflicting_occurrences(spans, existing_events)
+        )
+        if event_indexes
+    ]
+    if not conflicts:
+        return None
+
+    return generate_recurring_conflict_message(appointment, conflicts)
+
+
+async def create_events(appointments: List[AppointmentData]) -> List[dict]:
+    """Add the appointments to the calendar, returns one {"reply": str, "success": bool} per appointment"""
+    started = time.perf_counter()
+    results = await calendar_backend.create_events(appointments)
+    record_creation_time(len(appointments), time.perf_counter() - started)
+
+    # The mirrored copy of these days is outdated now, even when some events failed (a series may be half saved)
+    calendar_mirror.forget_appointments(appointments)
+
+    return results
+
+
+single_creation_times = []  # Wall time of the requests that created one event, to compare batches against
+
+
+def record_creation_time(event_count: int, elapsed: float) -> None:
+    """Log the wall time of an event creation, and how long creating the events one by one would have taken"""
+    if event_count == 1:
+        single_creation_times.append(elapsed)
+        print(f"Created 1 event in {elapsed:.1f}s")
+        return
+
+    message = f"Created {event_count} events in one batch in {elapsed:.1f}s"
+    if single_creation_times:
+        sequential = event_count * sum(single_creation_times) / len(single_creation_times)
+        message += f", about {sequential:.1f}s when created one by one"
+    print(message)
+
+
+async def finalize_assistant_response(assistant, transcript: str, reply_text: str, reply_text_for_audio: str=None) -> dict:
     """Centralized helper to update history, generate audio, and format API return."""
     assistant.append_chat_history({"role": "system", "content": reply_text})
     if reply_text_for_audio:
-        audio_data = generate_audio_base64(reply_text_for_audio)
+        audio_url = await generate_audio_url(reply_text_for_audio)
     else:
-        audio_data = generate_audio_base64(reply_text)
+        audio_url = await generate_audio_url(reply_text)
     
     return {
         "message": transcript,
         "reply": reply_text,
-        "audio": audio_data
+        "audio_url": audio_url
     }
\ No newline at end of file
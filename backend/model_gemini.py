@@ -1,20 +1,33 @@
+import os
 import json
 import datetime
 from pathlib import Path
+from typing import Dict, Optional, Tuple
 from google import genai
-from google.genai.types import Part, UserContent
+from google.genai.types import GenerateContentConfig, HttpOptions, Part, UserContent
 
-GEMINI_MODEL = "gemini-2.0-flash"
+GEMINI_MODEL = os.environ.get("GEMINI_MODEL", "gemini-2.0-flash")
+GEMINI_BASE_URL = os.environ.get("GEMINI_BASE_URL")  # e.g. a local stand-in of the API for benchmarks
 MP3_PATH = Path.joinpath(Path(__file__).parent, "recordings/talking.mp3")
 
+# Appended to the instructions when the recordings are sent to the model directly, without a local transcription
+AUDIO_REPLY_PROMPT = """
+    Input: The user talks to you through voice recordings.
+    Output Format: Answer every recording with a JSON object {"transcript": "<what the user said, word for word>", "reply": "<your answer, following the rules above>"}.
+"""
+
 class Gemini:
-    def __init__(self):
-        self.client = genai.Client()
+    def __init__(self, init_prompt: Optional[str] = None):
+        self.client = genai.Client(
+            http_options=HttpOptions(base_url=GEMINI_BASE_URL) if GEMINI_BASE_URL else None
+        )
+        self.pending_notes = []  # Messages of the system, sent along with the next user message
         current_time = datetime.datetime.now()
-        self.init_prompt = f'You are an assistant to help users to create a google calendar booking. The voice recording will be provided to you. Extract meeting details from audio using the current date {current_time}. The user must clearly specify the date amd start/end time of the meeting, and the purpose (e.g. meeting with whom). If these information are missing, output ONLY a follow-up question, until you have gathered all required information; otherwise, output ONLY the raw JSON without markdown wrappers, backticks, or preamble. Use dd/mm/yyyy for dates and HH:MMam/pm (no spaces) for times. Values should be empty strings if missing. The JSON must strictly follow this structure: {{"meeting_name": "", "location": "", "description": "", "start_date": "", "end_date": "", "start_time": "", "end_time": ""}}.'
+        self.init_prompt = init_prompt or f'You are an assistant to help users to create a google calendar booking. The voice recording will be provided to you. Extract meeting details from audio using the current date {current_time}. The user must clearly specify the date amd start/end time of the meeting, and the purpose (e.g. meeting with whom). If these information are missing, output ONLY a follow-up question, until you have gathered all required information; otherwise, output ONLY the raw JSON without markdown wrappers, backticks, or preamble. Use dd/mm/yyyy for dates and HH:MMam/pm (no spaces) for times. Values should be empty strings if missing. The JSON must strictly follow this structure: {{"meeting_name": "", "location": "", "description": "", "start_date": "", "end_date": "", "start_time": "", "end_time": ""}}.'
         self.restart_chat_session()
 
     def restart_chat_session(self):
+        self.pending_notes = []
         self.chat_session = self.client.chats.create(
             model=GEMINI_MODEL,
             history=[
@@ -40,6 +53,47 @@ class Gemini:
         except (ValueError, TypeError, json.JSONDecodeError):
             return response.text
 
+    def ask_a_question_with_audio(
+        self, audio_content: bytes, mime_type: str = "audio/mp3"
+    ) -> Tuple[str, str]:
+        """Send the recording straight to the model, which transcribes it and answers it in the same call.
+        The instructions must include AUDIO_REPLY_PROMPT.
+
+        Args:
+            audio_content: The recording, in memory
+            mime_type: The format of the recording
+
+        Returns:
+            The transcript of the recording and the reply of the model
+        """
+        notes = [Part(text=note) for note in self.pending_notes]
+        self.pending_notes = []
+
+        response = self.chat_session.send_message(
+            notes + [Part.from_bytes(data=audio_content, mime_type=mime_type)],
+            config=GenerateContentConfig(response_mime_type="application/json"),
+        )
+
+        try:
+            payload = json.loads(response.text)
+            reply = payload.get("reply", "")
+        except (ValueError, TypeError, AttributeError):
+            return "", response.text
+
+        # The appointment JSON is sometimes nested as an object rather than a string
+        if not isinstance(reply, str):
+            reply = json.dumps(reply)
+
+        return payload.get("transcript", ""), reply
+
+    def append_chat_history(self, chat_obj: Dict[str, str]) -> None:
+        """Same as LLM_Helper.append_chat_history, the message is sent with the next recording"""
+        self.pending_notes.append(f"[{chat_obj['role']}] {chat_obj['content']}")
+
+    def warm_up(self) -> None:
+        """Open the connection to the API, so the first recording does not wait for it"""
+        self.client.models.get(model=GEMINI_MODEL)
+
     def transcript(self):
         user_instruction_audio = self.client.files.upload(file=MP3_PATH)
         response = self.client.models.generate_content(
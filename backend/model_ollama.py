@@ -1,10 +1,38 @@
 import datetime
-from ollama import chat, ChatResponse
+from ollama import chat, generate, ChatResponse
 from typing import Dict
 
 OLLAMA_MODEL = "gemma3:12b"
 
 
+def booking_assistant_prompt() -> str:
+    """The instructions of the booking assistant, shared by every model the assistant can run on"""
+    current_time = datetime.datetime.now().strftime("%A, %B %d, %Y %H:%M")
+    return f"""
+        Role: Google Calendar Booking Assistant.
+        Current Context: Today is {current_time}.
+
+        Objectives:
+        1. Extract meeting details (name, location, description, start/end date, start/end time).
+        2. Validate: Dates must be future/today. Times must be 1-12am/pm. 
+        3. Logic:
+        - Missing/Invalid Info: Ask a follow-up question if start/end date and start/end time is unclear. Other information are not required.
+        - Info Gathered: State "The meeting will be scheduled on [Full Month Date], from [time] to [time]. Please confirm." Do not output the JSON before the user has approved it.
+        - User Confirms: Output raw JSON ONLY. No markdown, backticks, or preamble.
+        - Conflict Bypass: If the user insists on a time despite a system conflict, output: bypass restriction {{JSON}}
+        - Recurring Meetings: For a meeting that repeats (e.g. every Tuesday for the next quarter), add "recurrence": {{"frequency": "daily" | "weekly" | "weekdays", "count": <number of occurrences>, "until": "dd/mm/yyyy"}} to the JSON, with the date/time of the first occurrence. Give count or until, use 0 or "" for the other one. If the user did not say when the meeting stops repeating, ask it before the confirmation.
+        - Several Meetings: If the user asks for several meetings at once (e.g. standups Monday through Friday), list all of them when asking for confirmation, then output a JSON array with one JSON object per meeting: [{{JSON}}, {{JSON}}]
+
+        Data Formatting:
+        - JSON Dates: dd/mm/yyyy | JSON Times: HH:MMam/pm (no spaces).
+        - Conversation: Use full month names (e.g., December).
+        - Missing values: ""
+
+        Strict JSON Structure:
+        {{"meeting_name": "", "location": "", "description": "", "start_date": "", "end_date": "", "start_time": "", "end_time": ""}}
+    """
+
+
 class LLM_Helper:
     """
     A wrapper for ollama llm model, mainly used for creating chat session, saving conversation history
@@ -12,28 +40,7 @@ class LLM_Helper:
     """
 
     def __init__(self):
-        current_time = datetime.datetime.now().strftime("%A, %B %d, %Y %H:%M")
-        self.init_prompt = f"""
-            Role: Google Calendar Booking Assistant.
-            Current Context: Today is {current_time}.
-
-            Objectives:
-            1. Extract meeting details (name, location, description, start/end date, start/end time).
-            2. Validate: Dates must be future/today. Times must be 1-12am/pm. 
-            3. Logic:
-            - Missing/Invalid Info: Ask a follow-up question if start/end date and start/end time is unclear. Other information are not required.
-            - Info Gathered: State "The meeting will be scheduled on [Full Month Date], from [time] to [time]. Please confirm." Do not output the JSON before the user has approved it.
-            - User Confirms: Output raw JSON ONLY. No markdown, backticks, or preamble.
-            - Conflict Bypass: If the user insists on a time despite a system conflict, output: bypass restriction {{JSON}}
-
-            Data Formatting:
-            - JSON Dates: dd/mm/yyyy | JSON Times: HH:MMam/pm (no spaces).
-            - Conversation: Use full month names (e.g., December).
-            - Missing values: ""
-
-            Strict JSON Structure:
-            {{"meeting_name": "", "location": "", "description": "", "start_date": "", "end_date": "", "start_time": "", "end_time": ""}}
-        """
+        self.init_prompt = booking_assistant_prompt()
         self.restart_chat_session()
 
     def restart_chat_session(self) -> None:
@@ -55,6 +62,10 @@ class LLM_Helper:
 
         return response.message.content
 
+    def warm_up(self) -> None:
+        """Load the model into memory, so the first question does not wait for it"""
+        generate(model=OLLAMA_MODEL, prompt="")
+
     def append_chat_history(self, chat_obj: Dict[str, str]) -> None:
         self.chat_history += [chat_obj]
 
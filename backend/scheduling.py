@@ -1,7 +1,39 @@
+import re
+import sqlite3
+import asyncio
+from pathlib import Path
+from urllib.parse import urlencode
+from contextlib import asynccontextmanager
 from datetime import datetime, timedelta
-from playwright.sync_api import sync_playwright
-from playwright.async_api import async_playwright
-from typing import List, TypedDict, Tuple
+from typing import Iterator, List, NotRequired, Optional, TypedDict, Tuple
+
+# Playwright and numpy are imported where they are used, they are slow to import and not needed to start the server
+
+RECURRENCE_FREQUENCIES = ("daily", "weekly", "weekdays")
+MAX_OCCURRENCES = 366  # Upper bound of the expansion, even when a larger count is asked for
+OPEN_ENDED_RECURRENCE_WEEKS = 13  # A recurrence with neither count nor until stops after a quarter
+
+
+BROWSER_ARGS = ["--disable-blink-features=AutomationControlled"]
+LOGIN_CHECK_TIMEOUT = 15000  # How long the calendar page may take to show whether the user is signed in (ms)
+SESSION_PROFILE_DIR = "session"  # The persistent browser profile, keeps the login cookies across restarts
+GOOGLE_SIGN_IN_COOKIES = ("SID", "__Secure-1PSID", "__Secure-3PSID")
+EVENTEDIT_URL = "https://calendar.google.com/calendar/r/eventedit"
+SIGN_IN_REQUIRED_REPLY = "I can't access your calendar anymore, you need to sign in again. Please click the Login button."
+
+# Chromium cannot open the same persistent profile twice, browser operations on "session" take turns
+# when the resident browser is not running
+calendar_session_lock = asyncio.Lock()
+
+# The resident browser, see start_browser()
+playwright_driver = None
+browser_context = None
+
+
+class Recurrence(TypedDict, total=False):
+    frequency: str  # One of RECURRENCE_FREQUENCIES
+    count: int  # Number of occurrences
+    until: str  # dd/mm/yyyy, date of the last possible occurrence
 
 
 class AppointmentData(TypedDict):
@@ -12,6 +44,49 @@ class AppointmentData(TypedDict):
     end_date: str
     start_time: str
     end_time: str
+    recurrence: NotRequired[Recurrence]
+
+
+class ScrapedEvent(TypedDict):
+    datekey: int  # See get_google_calendar_datekey
+    time: str  # As shown on the website, e.g. '10:30am – 5:21pm' or 'All day'
+    title: str
+
+
+# Collects the events of the requested days in a single round trip to the browser, duplicates removed.
+# In the Schedule view, a day is a div[data-datekey] container, an event is one of its div[role="row"],
+# and the second div of the row holds the time and the title.
+EXTRACT_EVENTS_SCRIPT = """
+(datekeys) => {
+    const events = [];
+    const seen = new Set();
+    for (const datekey of datekeys) {
+        for (const container of document.querySelectorAll(`div[data-datekey="${datekey}"]`)) {
+            for (const row of container.querySelectorAll('div[role="row"]')) {
+                const details = Array.from(row.children).filter((child) => child.tagName === "DIV")[1];
+                if (!details) continue;
+
+                const texts = [];
+                for (const div of details.querySelectorAll("div")) {
+                    const text = div.innerText.trim();
+                    if (text && !texts.includes(text)) texts.push(text);
+                }
+                if (!texts.length) continue;
+
+                const event = {datekey: datekey, time: texts[0], title: texts[1] || ""};
+                const key = JSON.stringify(event);
+                if (!seen.has(key)) {
+                    seen.add(key);
+                    events.push(event);
+                }
+            }
+        }
+    }
+
+    const rendered = Array.from(document.querySelectorAll("div[data-datekey]"), (c) => Number(c.dataset.datekey));
+    return {events: events, lastDatekey: rendered.length ? Math.max(...rendered) : null};
+}
+"""
 
 
 def get_google_calendar_datekey(date_str: str) -> int:
@@ -36,32 +111,155 @@ def get_google_calendar_datekey(date_str: str) -> int:
     return datekey
 
 
-def check_if_google_calendar_login() -> None:
-    """ Check if the user has login to Google Calendar
+async def start_browser() -> None:
+    """ Start Playwright and open the 'session' browser profile once, so that the calendar operations only
+        need to open a new page instead of launching a browser each time.
+        The browser is headless, the background operations (mirror sync, login checks) must not open tabs in
+        the user's window. Only the manual sign in shows a window, see open_google_calendar_login().
     """
+    global playwright_driver, browser_context
+    from playwright.async_api import async_playwright
+
+    playwright_driver = await async_playwright().start()
+    browser_context = await playwright_driver.chromium.launch_persistent_context(
+        SESSION_PROFILE_DIR,  # Save cache
+        headless=True,
+        args=BROWSER_ARGS,
+    )
 
-    selector = '[aria-label="Switch to Tasks"],[data-g-action="sign in"]'
+    def on_close(_):
+        # The browser crashed or was stopped, the next operations launch their own browser
+        global browser_context
+        browser_context = None
+
+    browser_context.on("close", on_close)
+
+
+async def stop_browser() -> None:
+    global playwright_driver, browser_context
+
+    if browser_context is not None:
+        await browser_context.close()
+        browser_context = None
+    if playwright_driver is not None:
+        await playwright_driver.stop()
+        playwright_driver = None
+
+
+@asynccontextmanager
+async def calendar_page(headless: bool = True):
+    """ A new page of the resident browser, or of a browser launched for this operation only if it is not running.
+        A visible page (headless=False) always gets its own browser, the resident one is headless.
+    """
+    if headless and browser_context is not None:
+        page = await browser_context.new_page()
+        try:
+            yield page
+        finally:
+            await page.close()
+        return
+
+    from playwright.async_api import async_playwright
+
+    async with calendar_session_lock, async_playwright() as p:
+        context = await p.chromium.launch_persistent_context(
+            SESSION_PROFILE_DIR,
+            headless=headless,
+            args=BROWSER_ARGS,
+        )
+        try:
+            yield await context.new_page()
+        finally:
+            await context.close()
 
-    with sync_playwright() as p:
-        context = p.chromium.launch_persistent_context("session", headless=True)
-        page = context.new_page()
 
-        page.goto("https://calendar.google.com")
+async def check_if_google_calendar_login() -> bool:
+    """ Check if the user has login to Google Calendar.
+        Raises (e.g. a Playwright TimeoutError) when the page shows neither the calendar nor a way to sign in,
+        which tells nothing about the login.
+    """
+
+    selector = '[aria-label="Switch to Tasks"],[data-g-action="sign in"]'
+
+    async with calendar_page() as page:
+        await page.goto("https://calendar.google.com", timeout=LOGIN_CHECK_TIMEOUT)
         try:
-            element = page.wait_for_selector(selector, timeout=0)
-            label = element.get_attribute("aria-label")
+            element = await page.wait_for_selector(selector, timeout=LOGIN_CHECK_TIMEOUT)
+        except Exception:
+            # Google sends the users who are signed out to its sign in page
+            if not page.url.startswith("https://calendar.google.com"):
+                return False
+            raise
+        label = await element.get_attribute("aria-label")
+
+    # Otherwise it is the "sign in" button
+    return label == "Switch to Tasks"
+
 
-            if label == "Switch to Tasks":
-                context.close()
-                return True
+def get_session_cookie_expiry(profile_dir: str = SESSION_PROFILE_DIR) -> Optional[datetime]:
+    """ Read when the Google sign-in cookies of the browser profile expire, straight from its Cookies database,
+        without opening the browser.
 
-            elif label == "sign in":
-                context.close()
-                return True
+    Returns:
+        The earliest expiry (UTC, naive) of the sign-in cookies, None if the profile has no persistent sign-in cookie
+    """
+    # The location of the database depends on the version of Chromium
+    candidates = [Path(profile_dir, "Default", "Network", "Cookies"), Path(profile_dir, "Default", "Cookies")]
+    cookies_db = next((c for c in candidates if c.exists()), None)
+    if cookies_db is None:
+        return None
+
+    # immutable: Chromium keeps the database locked while it runs
+    conn = sqlite3.connect(f"{cookies_db.resolve().as_uri()}?mode=ro&immutable=1", uri=True)
+    try:
+        rows = conn.execute(
+            f"""
+            SELECT expires_utc FROM cookies
+            WHERE host_key LIKE '%google.com' AND has_expires = 1
+            AND name IN ({", ".join("?" for _ in GOOGLE_SIGN_IN_COOKIES)})
+            """,
+            GOOGLE_SIGN_IN_COOKIES,
+        ).fetchall()
+    except sqlite3.Error as e:
+        print(f"Failed to read the cookies of the browser profile: {e}")
+        return None
+    finally:
+        conn.close()
+
+    if not rows:
+        return None
+
+    # Chromium counts microseconds since 1601-01-01 UTC
+    return datetime(1601, 1, 1) + timedelta(microseconds=min(r[0] for r in rows))
 
-        except Exception as e:
-            context.close()
-            return False
+
+async def open_google_calendar_login() -> bool:
+    """ Open Google Calendar in a visible browser window so the user can sign in manually.
+        The login cookies are kept in the persistent 'session' directory across restarts.
+
+    Returns:
+        True once the calendar is shown, False if something went wrong while signing in
+    """
+
+    # Chromium cannot open the profile twice, the resident headless browser makes way for the visible window
+    resident = browser_context is not None
+    if resident:
+        await stop_browser()
+
+    try:
+        async with calendar_page(headless=False) as page:
+            await page.goto("https://calendar.google.com")
+
+            try:
+                await page.wait_for_selector('[aria-label="Switch to Tasks"]', timeout=0)
+                await page.wait_for_load_state("networkidle")
+            except Exception as _:
+                return False
+    finally:
+        if resident:
+            await start_browser()
+
+    return True
 
 
 def parse_google_timestr_to_24h_range(time_str: str) -> Tuple[str]:
@@ -165,13 +363,244 @@ def validate_meeting_time(appointment: AppointmentData) -> Tuple[bool, str]:
                 )
             return False, "End date/time cannot be before start date/time."
 
+        # 3. Check the recurrence, if any. It comes from the LLM, it may not even be an object
+        if appointment.get("recurrence") and not isinstance(appointment["recurrence"], dict):
+            return False, "I could not understand how the meeting repeats. Please say how often and until when."
+        recurrence = get_recurrence(appointment)
+        if recurrence:
+            if recurrence["frequency"] not in RECURRENCE_FREQUENCIES:
+                return False, "Meetings can only repeat daily, weekly or on weekdays."
+            if recurrence.get("count") and int(recurrence["count"]) < 1:
+                return False, "The meeting must happen at least once."
+            if recurrence.get("until") and (
+                datetime.strptime(recurrence["until"], "%d/%m/%Y").date() < start_dt.date()
+            ):
+                return False, "The repetition ends before the first meeting."
+            # e.g. on weekdays, from a Saturday until the next Sunday
+            if next(expand_occurrences(appointment), None) is None:
+                return False, "No meeting falls within the repetition. Please check the first date and the end."
+
         return True, "Valid meeting time."
 
-    except ValueError as e:
+    except (ValueError, TypeError) as e:
         # This catches invalid dates (e.g., 32/12/2025) or bad formatting
         return False, f"Your date is likely invalid."
 
 
+def get_recurrence(appointment: AppointmentData) -> Optional[Recurrence]:
+    """ The recurrence of the appointment, None if it happens only once
+    """
+    recurrence = appointment.get("recurrence")
+    if not isinstance(recurrence, dict) or not recurrence.get("frequency"):
+        return None
+
+    return recurrence
+
+
+def expand_occurrences(appointment: AppointmentData) -> Iterator[AppointmentData]:
+    """ Lazily generate every occurrence of a recurring appointment, as non-recurring appointments.
+        An appointment without recurrence has a single occurrence, itself.
+
+    Example:
+        {'start_date': '06/01/2026', 'end_date': '06/01/2026', 'start_time': '02:00pm', 'end_time': '03:00pm',
+         'recurrence': {'frequency': 'weekly', 'count': 3}, ...}
+        -> 06/01/2026, 13/01/2026 and 20/01/2026 from 02:00pm to 03:00pm
+    """
+    recurrence = get_recurrence(appointment)
+    if not recurrence:
+        yield appointment
+        return
+
+    start_dt = datetime.strptime(
+        f"{appointment['start_date']} {appointment['start_time']}", "%d/%m/%Y %I:%M%p"
+    )
+    end_dt = datetime.strptime(
+        f"{appointment['end_date']} {appointment['end_time']}", "%d/%m/%Y %I:%M%p"
+    )
+    duration = end_dt - start_dt
+
+    count = int(recurrence.get("count") or 0) or MAX_OCCURRENCES
+    until = (
+        datetime.strptime(recurrence["until"], "%d/%m/%Y").date()
+        if recurrence.get("until")
+        else None
+    )
+    if not recurrence.get("count") and until is None:
+        # Open-ended, e.g. "every Tuesday": do not fill the calendar for years
+        until = (start_dt + timedelta(weeks=OPEN_ENDED_RECURRENCE_WEEKS)).date()
+    step = timedelta(weeks=1) if recurrence["frequency"] == "weekly" else timedelta(days=1)
+
+    occurrence_start = start_dt
+    produced = 0
+    while produced < min(count, MAX_OCCURRENCES) and (
+        until is None or occurrence_start.date() <= until
+    ):
+        if recurrence["frequency"] != "weekdays" or occurrence_start.weekday() < 5:
+            occurrence_end = occurrence_start + duration
+            occurrence = {k: v for k, v in appointment.items() if k != "recurrence"}
+            occurrence.update(
+                {
+                    "start_date": occurrence_start.strftime("%d/%m/%Y"),
+                    "end_date": occurrence_end.strftime("%d/%m/%Y"),
+                }
+            )
+            yield occurrence
+            produced += 1
+
+        occurrence_start += step
+
+
+def recurrence_to_rrule(appointment: AppointmentData) -> str:
+    """ The RFC 5545 rule of a recurring appointment, e.g. 'RRULE:FREQ=WEEKLY;COUNT=13'.
+        COUNT is taken from expand_occurrences, so both agree on the occurrences when an until date is given too.
+    """
+    frequency = {
+        "daily": "FREQ=DAILY",
+        "weekly": "FREQ=WEEKLY",
+        "weekdays": "FREQ=WEEKLY;BYDAY=MO,TU,WE,TH,FR",
+    }[get_recurrence(appointment)["frequency"]]
+    count = sum(1 for _ in expand_occurrences(appointment))
+
+    return f"RRULE:{frequency};COUNT={count}"
+
+
+def find_conflicting_occurrences(
+    occurrences: List[Tuple[datetime, datetime]],
+    existing_events: List[Tuple[Tuple[datetime, datetime], str]],
+) -> List[List[int]]:
+    """ Check every occurrence of a recurring meeting against every existing event of the horizon at once.
+
+    Example:
+    Input:
+        occurrences:
+            [(datetime(2026, 1, 6, 14), datetime(2026, 1, 6, 15)),
+             (datetime(2026, 1, 13, 14), datetime(2026, 1, 13, 15))]
+        existing_events:
+            [((datetime(2026, 1, 13, 14, 30), datetime(2026, 1, 13, 16)), 'Team sync')]
+    Output:
+        The indexes of the events conflicting with each occurrence:
+            [[], [0]]
+    """
+    import numpy as np
+
+    if not occurrences or not existing_events:
+        return [[] for _ in occurrences]
+
+    to_minutes = lambda dts: np.array(
+        [int(dt.timestamp() // 60) for dt in dts], dtype=np.int64
+    )
+    occurrence_start = to_minutes(o[0] for o in occurrences)
+    occurrence_end = to_minutes(o[1] for o in occurrences)
+    event_start = to_minutes(e[0][0] for e in existing_events)
+    event_end = to_minutes(e[0][1] for e in existing_events)
+
+    # Overlap Check: (StartA < EndB) and (EndA > StartB), for every (occurrence, event) pair
+    overlaps = (occurrence_start[:, None] < event_end[None, :]) & (
+        occurrence_end[:, None] > event_start[None, :]
+    )
+
+    return [np.flatnonzero(row).tolist() for row in overlaps]
+
+
+def generate_recurring_conflict_message(
+    appointment: AppointmentData, conflicts: List[Tuple[AppointmentData, List[str]]]
+) -> str:
+    """ Summarize the conflicting occurrences of a recurring meeting in a few lines
+
+    Args:
+        appointment: The recurring appointment
+        conflicts: Each conflicting occurrence with the titles of the events it conflicts with
+
+    Returns:
+        e.g. 'Team review: 2 of 13 occurrences conflict: January 13 (Team sync), February 3 (Dentist, Offsite).'
+    """
+    max_listed = 5
+    total = sum(1 for _ in expand_occurrences(appointment))
+    format_date = lambda d: datetime.strptime(d, "%d/%m/%Y").strftime("%B %d").replace(" 0", " ")
+
+    listed = [
+        f"{format_date(occurrence['start_date'])} ({', '.join(dict.fromkeys(titles))})"
+        for occurrence, titles in conflicts[:max_listed]
+    ]
+    if len(conflicts) > max_listed:
+        listed.append(f"and {len(conflicts) - max_listed} more")
+
+    return (
+        f"{appointment['meeting_name'] or 'Meeting'}: {len(conflicts)} of {total} occurrences conflict: "
+        f"{', '.join(listed)}."
+    )
+
+
+def parse_confirmation_message(message: str) -> Optional[AppointmentData]:
+    """ Extract the proposed slot from the confirmation sentence the LLM says before it outputs the JSON.
+
+    Example:
+        'The meeting will be scheduled on December 31, 2025, from 1pm to 2:30pm. Please confirm.'
+        -> {'start_date': '31/12/2025', 'end_date': '31/12/2025', 'start_time': '01:00pm', 'end_time': '02:30pm', ...}
+
+    Args:
+        message: The raw reply of the LLM
+
+    Returns:
+        An appointment holding only the date/time of the proposed slot, or None if the message is not a confirmation
+        or the slot cannot be parsed.
+    """
+    match = re.search(
+        r"scheduled on (?P<date>.+?),? from (?P<start>\d{1,2}(?::\d{2})?\s*[ap]\.?m\.?)"
+        r" (?:to|until|-|–) (?P<end>\d{1,2}(?::\d{2})?\s*[ap]\.?m\.?)",
+        message,
+        re.IGNORECASE,
+    )
+    if not match:
+        return None
+
+    def to_form_time(t: str) -> str:
+        t = t.lower().replace(".", "").replace(" ", "")
+        fmt = "%I:%M%p" if ":" in t else "%I%p"
+        return datetime.strptime(t, fmt).strftime("%I:%M%p").lower()
+
+    # e.g. 'Wednesday, December 31st, 2025' -> 'December 31, 2025'
+    date_str = re.sub(r"(\d)(st|nd|rd|th)\b", r"\1", match.group("date"))
+    date_str = re.sub(r"^[A-Za-z]+day,?\s+", "", date_str.strip()).replace(",", "")
+
+    date_obj = None
+    for fmt in ("%B %d %Y", "%d %B %Y"):
+        try:
+            date_obj = datetime.strptime(date_str, fmt)
+            break
+        except ValueError:
+            continue
+    if date_obj is None:
+        # The year is sometimes omitted, e.g. 'December 31'
+        for fmt in ("%B %d", "%d %B"):
+            try:
+                date_obj = datetime.strptime(date_str, fmt).replace(year=datetime.now().year)
+                break
+            except ValueError:
+                continue
+        if date_obj is None:
+            return None
+        if date_obj.date() < datetime.now().date():
+            date_obj = date_obj.replace(year=date_obj.year + 1)
+
+    try:
+        start_time = to_form_time(match.group("start"))
+        end_time = to_form_time(match.group("end"))
+    except ValueError:
+        return None
+
+    date_str = date_obj.strftime("%d/%m/%Y")
+    return {
+        "meeting_name": "",
+        "location": "",
+        "description": "",
+        "start_date": date_str,
+        "end_date": date_str,
+        "start_time": start_time,
+        "end_time": end_time,
+    }
+
+
 def parse_calendar_time(time_str: str) -> str:
     """ Convert Display time format on Google Calendar to 24-Hours format
 
@@ -371,95 +800,158 @@ def generate_conflict_message(conflict_data) -> str:
     return "\n".join(lines)
 
 
-async def add_calendar_event(schedule_detail: dict):
-    if schedule_detail["meeting_name"] == "":
-        schedule_detail["meeting_name"] = "Meeting"
-    # Use the async_playwright context manager
-    async with async_playwright() as p:
-        # Launching persistent context is also an async action
-        context = await p.chromium.launch_persistent_context(
-            "session",
-            headless=False,
-            args=["--disable-blink-features=AutomationControlled"],
-        )
+def eventedit_url(schedule_detail: AppointmentData) -> str:
+    """ The eventedit page prefilled with the appointment, the form has no field for a custom repetition. e.g.
+        {'meeting_name': 'Standup', 'start_date': '24/10/2026', 'start_time': '10:00am', 'end_time': '10:15am',
+         'recurrence': {'frequency': 'weekdays', 'count': 3}, ...}
+        -> .../eventedit?text=Standup&dates=20261026T100000%2F20261026T101500&recur=RRULE%3AFREQ%3DWEEKLY%3B...
+        The event starts on its first occurrence, Google counts the start as one even when the rule skips its day.
+    """
+    first = next(expand_occurrences(schedule_detail))
+    start_dt = datetime.strptime(f"{first['start_date']} {first['start_time']}", "%d/%m/%Y %I:%M%p")
+    end_dt = datetime.strptime(f"{first['end_date']} {first['end_time']}", "%d/%m/%Y %I:%M%p")
 
-        page = await context.new_page()
+    params = {
+        "text": schedule_detail["meeting_name"] or "Meeting",
+        "dates": f"{start_dt:%Y%m%dT%H%M%S}/{end_dt:%Y%m%dT%H%M%S}",
+        "location": schedule_detail["location"],
+        "details": schedule_detail["description"],
+        "recur": recurrence_to_rrule(schedule_detail),
+    }
 
-        try:
-            await page.goto("https://calendar.google.com")
+    return f"{EVENTEDIT_URL}?{urlencode(params)}"
 
-            # Wait for the login state/main grid
-            # Use a long timeout instead of 0 to prevent the API from hanging forever
-            await page.wait_for_selector(
-                '[aria-label="Switch to Tasks"]', timeout=60000
-            )
 
-            # Navigate to the event creation page
-            await page.goto("https://calendar.google.com/calendar/r/eventedit")
-            await page.wait_for_selector('[aria-label="Save"]', timeout=10000)
+async def save_event_form(page) -> None:
+    # Click save and wait for the network to settle to ensure the save completes
+    await page.get_by_label("Save").click()
+    await page.wait_for_load_state("networkidle")
 
-            print("Start filling information...")
 
-            format_date = lambda d: datetime.strptime(d, "%d/%m/%Y").strftime(
-                "%m/%d/%Y"
-            )
+async def fill_event_form(page, schedule_detail: dict) -> None:
+    """ Fill the eventedit form of Google Calendar with the appointment and save it
+    """
+    format_date = lambda d: datetime.strptime(d, "%d/%m/%Y").strftime(
+        "%m/%d/%Y"
+    )
 
-            # Every action (fill, click, etc.) must be awaited
-            await page.fill(
-                'input[aria-label="Title"]', schedule_detail["meeting_name"]
-            )
-            await page.fill(
-                'input[aria-label="Start date"]',
-                format_date(schedule_detail["start_date"]),
-            )
-            await page.fill(
-                'input[aria-label="Start time"]', schedule_detail["start_time"]
-            )
-            await page.fill(
-                'input[aria-label="End date"]', format_date(schedule_detail["end_date"])
-            )
-            await page.fill('input[aria-label="End time"]', schedule_detail["end_time"])
-            await page.fill(
-                'input[aria-label="Add location"]', schedule_detail["location"]
-            )
-            await page.fill(
-                'div[aria-label="Description"]', schedule_detail["description"]
-            )
+    # Every action (fill, click, etc.) must be awaited
+    await page.fill(
+        'input[aria-label="Title"]', schedule_detail["meeting_name"] or "Meeting"
+    )
+    await page.fill(
+        'input[aria-label="Start date"]',
+        format_date(schedule_detail["start_date"]),
+    )
+    await page.fill(
+        'input[aria-label="Start time"]', schedule_detail["start_time"]
+    )
+    await page.fill(
+        'input[aria-label="End date"]', format_date(schedule_detail["end_date"])
+    )
+    await page.fill('input[aria-label="End time"]', schedule_detail["end_time"])
+    await page.fill(
+        'input[aria-label="Add location"]', schedule_detail["location"]
+    )
+    await page.fill(
+        'div[aria-label="Description"]', schedule_detail["description"]
+    )
 
-            # Click save and wait for the network to settle to ensure the save completes
-            await page.get_by_label("Save").click()
-            await page.wait_for_load_state("networkidle")
+    await save_event_form(page)
 
-            assistant_response = "Great! I've added that to your calendar."
-            success = True
 
-        except Exception as e:
-            assistant_response = (
-                "I ran into an issue saving the event. Please check the browser window."
-            )
-            success = False
-        finally:
-            # Closing the context is also async
-            await context.close()
+async def add_calendar_events(schedule_details: List[dict]) -> List[dict]:
+    """ Create several events in a single browser session, going back to the eventedit form of the same page
+        after every save instead of launching a browser per event.
+
+    Args:
+        schedule_details: The appointments to add
+
+    Returns:
+        One {"reply": str, "success": bool} per appointment, in the same order
+    """
+    results = []
+    failed_reply = "I ran into an issue saving the event. Please try again."
+
+    async with calendar_page() as page:
+        for schedule_detail in schedule_details:
+            recurring = get_recurrence(schedule_detail) is not None
+            try:
+                # Navigate to the event creation page, prefilled for a recurring meeting
+                await page.goto(
+                    eventedit_url(schedule_detail) if recurring else EVENTEDIT_URL, timeout=LOGIN_CHECK_TIMEOUT
+                )
+
+                # Signed out: Google redirects to its sign in page, the other events would fail the same way
+                if not page.url.startswith("https://calendar.google.com"):
+                    results += [
+                        {"reply": SIGN_IN_REQUIRED_REPLY, "success": False}
+                        for _ in schedule_details[len(results) :]
+                    ]
+                    break
+
+                await page.wait_for_selector('[aria-label="Save"]', timeout=10000)
+
+                print(f"Start filling information of {schedule_detail['meeting_name']}...")
+                if recurring:
+                    # Typing the dates again could change the repetition
+                    await save_event_form(page)
+                else:
+                    await fill_event_form(page, schedule_detail)
+
+                results.append(
+                    {"reply": "Great! I've added that to your calendar.", "success": True}
+                )
 
-    return {"reply": assistant_response, "success": success}
+            except Exception as e:
+                results.append({"reply": failed_reply, "success": False})
 
+    return results
 
-async def get_event_from_date(dateStr) -> list[list[str]]:
+
+async def add_calendar_event(schedule_detail: dict):
+    if schedule_detail["meeting_name"] == "":
+        schedule_detail["meeting_name"] = "Meeting"
+
+    return (await add_calendar_events([schedule_detail]))[0]
+
+
+async def extract_events(page, datekeys: List[int]) -> Tuple[List[ScrapedEvent], Optional[int]]:
+    """ Read the events of the given days from the page, with a single page.evaluate call
+
+    Returns:
+        A tuple containing:
+            - The events, e.g. [{'datekey': 28574, 'time': '10:30am – 5:21pm', 'title': 'Meeting with Team'}]
+            - The datekey of the last day rendered in the page, None if no day is rendered
     """
-    Check schedule conflict using Async Playwright
+    result = await page.evaluate(EXTRACT_EVENTS_SCRIPT, datekeys)
+
+    return result["events"], result["lastDatekey"]
+
+
+async def go_to_date(page, dateStr: str) -> None:
+    """Show the day in the current view of the calendar, through the "Go to date" shortcut"""
+    formatted_date = datetime.strptime(dateStr, "%d%m%Y").strftime("%b %d, %Y")
+
+    # Toggle "Go to date"
+    await page.keyboard.press("g")
+    await page.wait_for_selector('input[aria-label="Date"]')
+    await page.wait_for_timeout(1000)
+
+    await page.keyboard.type(formatted_date, delay=100)
+    await page.keyboard.press("Enter")
+    await page.wait_for_timeout(2000)  # Wait for view to update
+
+
+async def get_events_from_dates(date_strs: List[str]) -> List[ScrapedEvent]:
+    """ Scrape the events of several days (%d%m%Y) using Async Playwright.
+        The Schedule view shows the days following the one we go to, so the page is only moved again for
+        the days which were not rendered yet.
     """
-    date_obj = datetime.strptime(dateStr, "%d%m%Y")
-    formatted_date = date_obj.strftime("%b %d, %Y")
+    remaining = sorted(date_strs, key=get_google_calendar_datekey)
     events = []
 
-    async with async_playwright() as p:
-        context = await p.chromium.launch_persistent_context(
-            "session",
-            headless=False,
-            args=["--disable-blink-features=AutomationControlled"],
-        )
-        page = await context.new_page()
+    async with calendar_page() as page:
         await page.goto("https://calendar.google.com")
 
         # Await the selector
@@ -469,39 +961,29 @@ async def get_event_from_date(dateStr) -> list[list[str]]:
         await page.keyboard.press("a")
         await page.wait_for_timeout(1000)  # Async replacement for time.sleep
 
-        # Toggle "Go to date"
-        await page.keyboard.press("g")
-        await page.wait_for_selector('input[aria-label="Date"]')
-        await page.wait_for_timeout(1000)
-
-        await page.keyboard.type(formatted_date, delay=100)
-        await page.keyboard.press("Enter")
-        await page.wait_for_timeout(2000)  # Wait for view to update
-
-        target_key = get_google_calendar_datekey(dateStr)
-        day_container = page.locator(f'div[data-datekey="{target_key}"]')
-
-        # .all() is an async method in the async API
-        rows = await day_container.locator('div[role="row"]').all()
-
-        for row in rows:
-            second_div = row.locator("xpath=./div[2]")
-            # .count() is async
-            if await second_div.count() > 0:
-                # .all_inner_texts() is async
-                nested_texts = await second_div.locator("div").all_inner_texts()
-
-                clean_row_list = [text.strip() for text in nested_texts if text.strip()]
-                unique_row_list = list(dict.fromkeys(clean_row_list))
-
-                if unique_row_list:
-                    events.append(unique_row_list)
+        while remaining:
+            await go_to_date(page, remaining[0])
+            found, last_datekey = await extract_events(
+                page, [get_google_calendar_datekey(d) for d in remaining]
+            )
+            events += found
 
-        await context.close()
+            # The days up to the last rendered one are done, even the ones without any event
+            remaining = [
+                d
+                for d in remaining[1:]
+                if last_datekey is None or get_google_calendar_datekey(d) > last_datekey
+            ]
 
     return events
 
 
+async def get_event_from_date(dateStr) -> list[list[str]]:
+    """
+    Check schedule conflict using Async Playwright, returns the [time, title] of each event of the day
+    """
+    return [[e["time"], e["title"]] for e in await get_events_from_dates([dateStr])]
+
 
 if __name__ == "__main__":
     add_calendar_event()
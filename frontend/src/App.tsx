@@ -6,14 +6,18 @@ interface CalendarApiResponse {
   // status: string;
   message: string;
   reply: string;
-  audio: string;
+  audio_url: string;
   // state?: any;
   conflicted_date: string;
 }
 
 interface LoginResponse {
   reply: string;
-  audio: string;
+  audio_url: string;
+}
+
+interface AudioResponse {
+  audio_url: string;
 }
 
 const init_log_message = "Hi there! I’m your calendar assistant. I can help you schedule new meetings on Google Calendar. If you're not signed in your google account, a window will appear for you to log in.";
@@ -68,7 +72,7 @@ function App() {
         setLogs((prev) => [...prev, `[${timestamp}] You: ${data['message']}`]);
         setLogs((prev) => [...prev, `[${timestamp}] Assistant: ${data['reply']}`]);
 
-        const audio = new Audio(`data:audio/mp3;base64,${data['audio']}`);
+        const audio = new Audio(data['audio_url']);
         await audio.play();
 
         stream.getTracks().forEach(track => track.stop());
@@ -99,12 +103,12 @@ function App() {
     const response_welcome_msg_audio = await fetch(`/api/get-audio?text=${encodeURIComponent(init_log_message)}`, {
       method: 'POST',
     });
-    const data: CalendarApiResponse = await response_welcome_msg_audio.json();
+    const data: AudioResponse = await response_welcome_msg_audio.json();
     const timestamp = new Date().toLocaleTimeString();
     setLogs(() => [`[${timestamp}] Assistant: ${init_log_message}`]);
     
     await new Promise((resolve, reject) => { 
-      const audio = new Audio(`data:audio/mp3;base64,${data['audio']}`);
+      const audio = new Audio(data['audio_url']);
 
       audio.onended = () => resolve(true);
       audio.onerror = (err) => reject(err);
@@ -118,7 +122,7 @@ function App() {
       method: 'GET',
     });
     const login_response_data: LoginResponse = await login_response.json();
-    const login_status_audio = new Audio(`data:audio/mp3;base64,${login_response_data['audio']}`);
+    const login_status_audio = new Audio(login_response_data['audio_url']);
     const newtimestamp = new Date().toLocaleTimeString();
     setLogs((prev) => [...prev, `[${newtimestamp}] Assistant: ${login_response_data['reply']}`]);
     await login_status_audio.play();